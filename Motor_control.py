@@ -1,54 +1,60 @@
 # import curses and GPIO
-import pygame
-import RPi.GPIO as GPIO
 import os #added so we can shut down OK
 
-#Open a Pygame window to allow it to detect user events
-screen = pygame.display.set_mode([240, 160])
+from farmbot_nav.display import Display
+from farmbot_nav.hardware import MotorBackend
+from farmbot_nav.manual_input import ManualDriver
+from farmbot_nav.startup import StartupTimer
 
-#set GPIO numbering mode and define output pins
-GPIO.setmode(GPIO.BOARD)
-GPIO.setup(7,GPIO.OUT)
-GPIO.setup(11,GPIO.OUT)
-GPIO.setup(13,GPIO.OUT)
-GPIO.setup(15,GPIO.OUT)
+startup = StartupTimer()
 
-try:
-	while True:
-		for event in pygame.event.get():
+#GPIO numbering mode and output pins 7/11/13/15 are set up on the first key press
+motors = MotorBackend(on_first_command=lambda: startup.mark("first_motor_command"))
+
+def main():
+	startup.mark("imports")
+
+	#Open a Pygame window to allow it to detect user events
+	display = Display(240, 160, "Motor Control")
+	display.screen  # Opening the window starts the pygame event queue
+	pygame = display.pygame
+	startup.mark("display")
+
+	#Motor commands run on the driver thread as soon as a key arrives; if key
+	#events stop arriving (held keys repeat every 50 ms) the deadman stops the bot
+	driver = ManualDriver({
+		"right": lambda: motors.set(True,False,True,False),
+		"left": lambda: motors.set(False,True,False,True),
+		"up": lambda: motors.set(False,True,True,False),
+		"down": lambda: motors.set(True,False,False,True),
+	}, stop=motors.stop, deadman=0.3).start()
+	pygame.key.set_repeat(100, 50)
+	ARROWS = {pygame.K_RIGHT: "right", pygame.K_LEFT: "left", pygame.K_UP: "up", pygame.K_DOWN: "down"}
+
+	try:
+		while True:
+			event = pygame.event.wait()
 			if event.type == pygame.KEYDOWN:
 				if event.key == pygame.K_q:
-					pygame.quit()
+					break
 				#if event.key == pygame.K_s:
 				#	os.system ('sudo shutdown now') # shutdown right now!
-				elif event.key == pygame.K_RIGHT:
-					GPIO.output(7,True)
-					GPIO.output(11,False)
-					GPIO.output(13,True)
-					GPIO.output(15,False)
-				elif event.key == pygame.K_LEFT:
-					GPIO.output(7,False)
-					GPIO.output(11,True)
-					GPIO.output(13,False)
-					GPIO.output(15,True)
-				elif event.key == pygame.K_UP:
-					GPIO.output(7,False)
-					GPIO.output(11,True)
-					GPIO.output(13,True)
-					GPIO.output(15,False)					
-				elif event.key == pygame.K_DOWN:
-					GPIO.output(7,True)
-					GPIO.output(11,False)
-					GPIO.output(13,False)
-					GPIO.output(15,True)
-				
+				elif event.key in ARROWS:
+					driver.press(ARROWS[event.key])
+
 			elif event.type == pygame.KEYUP:
-				GPIO.output(7,False)
-				GPIO.output(11,False)
-				GPIO.output(13,False)
-				GPIO.output(15,False)
-			             
-finally:
-    #GPIO cleanup
-    GPIO.cleanup()
-    
+				driver.release()
+			elif event.type == pygame.QUIT:
+				break
+
+	finally:
+		driver.stop()
+		print(startup.report())
+		print(driver.latency_report())
+		#GPIO cleanup
+		motors.cleanup()
+		display.close()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,3 @@
+"""
+Shared support code for the Farmbot navigation scripts.
+"""
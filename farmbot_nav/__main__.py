@@ -0,0 +1,3 @@
+from farmbot_nav.runner import cli
+
+cli()
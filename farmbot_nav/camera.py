@@ -0,0 +1,254 @@
+"""
+Camera frame capture.
+
+A capture thread fills a preallocated ring of NumPy frames. Consumers get
+read-only views into the ring rather than copies, so memory stays flat for
+a whole field run. The ring lives in shared memory, which lets inspection
+worker processes attach to it and read the same frames by reference.
+"""
+import collections
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from farmbot_nav.inspection import Analyzer, register_analyzer
+
+# Picklable handle to one frame in a ring; valid until that slot is reused.
+FrameRef = collections.namedtuple(
+    "FrameRef", ["ring", "slots", "shape", "dtype", "slot", "seq", "timestamp"]
+)
+
+# --------------------------
+# Shared-Memory Ring Buffer
+# --------------------------
+class FrameRing:
+    """
+    Fixed number of frame slots in one shared memory block.
+
+    Layout: an int64 header ``[head, seq_0 .. seq_{n-1}]`` followed by the
+    frames. A slot's seq is -1 while it is being written, so readers can
+    tell whether the frame they hold a view of has been overwritten. A view
+    is not a snapshot: check ``is_current`` again after reading it, and
+    discard the result if the slot was reused in the meantime.
+    """
+
+    def __init__(self, slots, shape, dtype=np.uint8, name=None):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        header_bytes = (slots + 1) * 8
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self._owner = name is None
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(
+                create=True, size=header_bytes + slots * frame_bytes
+            )
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            # Attaching processes must not unlink the block when they exit.
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        self.name = self._shm.name
+        self._header = np.ndarray((slots + 1,), np.int64, buffer=self._shm.buf)
+        self.frames = np.ndarray(
+            (slots,) + self.shape, self.dtype,
+            buffer=self._shm.buf, offset=header_bytes,
+        )
+        if self._owner:
+            self._header[:] = -1
+            self._header[0] = 0
+            _attached_rings[self.name] = self
+        self._timestamps = [0.0] * slots
+
+    @property
+    def head(self):
+        """Number of frames committed so far."""
+        return int(self._header[0])
+
+    def begin_write(self):
+        """Return (slot, writable view) for the next frame to capture into."""
+        slot = self.head % self.slots
+        self._header[slot + 1] = -1
+        return slot, self.frames[slot]
+
+    def commit(self, slot, timestamp=None):
+        """Publish the frame written into ``slot`` and return its FrameRef."""
+        seq = self.head
+        timestamp = time.time() if timestamp is None else timestamp
+        self._timestamps[slot] = timestamp
+        self._header[slot + 1] = seq
+        self._header[0] = seq + 1
+        return self._ref(slot, seq, timestamp)
+
+    def latest(self):
+        """FrameRef for the newest complete frame, or None before the first."""
+        head = self.head
+        if head == 0:
+            return None
+        slot = (head - 1) % self.slots
+        return self._ref(slot, head - 1, self._timestamps[slot])
+
+    def is_current(self, ref):
+        """True while ``ref`` still points at the frame it was taken for."""
+        return int(self._header[ref.slot + 1]) == ref.seq
+
+    def view(self, ref):
+        """Read-only view of the frame behind ``ref``, or None if overwritten."""
+        if not self.is_current(ref):
+            return None
+        frame = self.frames[ref.slot].view()
+        frame.flags.writeable = False
+        return frame
+
+    def _ref(self, slot, seq, timestamp):
+        return FrameRef(self.name, self.slots, self.shape, self.dtype.str,
+                        slot, seq, timestamp)
+
+    def close(self):
+        self._header = None
+        self.frames = None
+        self._shm.close()
+        if self._owner:
+            _attached_rings.pop(self.name, None)
+            self._shm.unlink()
+
+_attached_rings = {}
+
+def frame_view(ref):
+    """
+    Resolve a FrameRef to a read-only view from any process.
+    Rings are attached once per process and cached.
+    """
+    ring = _attached_rings.get(ref.ring)
+    if ring is None:
+        ring = FrameRing(ref.slots, ref.shape, ref.dtype, name=ref.ring)
+        _attached_rings[ref.ring] = ring
+    return ring.view(ref)
+
+def frame_is_current(ref):
+    """True while the frame behind ``ref`` has not been overwritten (any process)."""
+    ring = _attached_rings.get(ref.ring)
+    return ring is not None and ring.is_current(ref)
+
+# --------------------------
+# Frame Sources
+# --------------------------
+class FrameSource:
+    """A camera. ``read_into`` fills ``out`` in place and returns True on success."""
+    shape = None
+
+    def read_into(self, out):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class SyntheticFrameSource(FrameSource):
+    """
+    Deterministic frames for testing off-robot. Each frame is a fixed
+    gradient with the frame counter in the green channel, written in place.
+    """
+
+    def __init__(self, width=320, height=240, fps=30):
+        self.shape = (height, width, 3)
+        self.interval = 1.0 / fps if fps else 0.0
+        self.count = 0
+        self._gradient = (np.arange(width, dtype=np.uint16) * 255 // max(width - 1, 1)).astype(np.uint8)
+        self._next = time.perf_counter()
+
+    def read_into(self, out):
+        if self.interval:
+            delay = self._next - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self._next = max(self._next + self.interval, time.perf_counter())
+        out[:, :, 0] = self._gradient
+        out[:, :, 1] = self.count & 0xFF
+        out[:, :, 2] = 0
+        self.count += 1
+        return True
+
+class OpenCVFrameSource(FrameSource):
+    """Pi camera / USB webcam through OpenCV (imported only when used)."""
+
+    def __init__(self, device=0, width=320, height=240):
+        import cv2
+        self._cap = cv2.VideoCapture(device)
+        self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.shape = (height, width, 3)
+
+    def read_into(self, out):
+        # VideoCapture.read decodes straight into ``out`` when shapes match.
+        ok, _ = self._cap.read(out)
+        return ok
+
+    def close(self):
+        self._cap.release()
+
+# --------------------------
+# Capture Thread
+# --------------------------
+class FrameCapture:
+    """Capture thread that keeps the newest ``slots`` frames of ``source``."""
+
+    def __init__(self, source, slots=8):
+        self.source = source
+        self.ring = FrameRing(slots, source.shape)
+        self.frames_captured = 0
+        self.read_failures = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="frame-capture", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            slot, out = self.ring.begin_write()
+            if self.source.read_into(out):
+                self.ring.commit(slot)
+                self.frames_captured += 1
+            else:
+                self.read_failures += 1
+                time.sleep(0.01)
+
+    def latest(self):
+        """FrameRef for the newest frame (pass this to inspection workers)."""
+        return self.ring.latest()
+
+    def view(self, ref):
+        """Read-only view of a captured frame, or None if it was overwritten."""
+        return self.ring.view(ref)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.source.close()
+        self.ring.close()
+
+# --------------------------
+# Frame-Based Analyzer
+# --------------------------
+@register_analyzer("frame_stats")
+class FrameStatsAnalyzer(Analyzer):
+    """
+    Mean brightness of the frame attached to a job, read through a view.
+    The slot is checked again after the mean is computed, since the capture
+    thread may have started overwriting it while it was being read.
+    """
+
+    def analyze(self, job):
+        ref = job.payload
+        if not isinstance(ref, FrameRef):
+            return {"frame": None}
+        frame = frame_view(ref)
+        if frame is None:
+            return {"frame": ref.seq, "stale": True}
+        mean = float(frame.mean())
+        if not frame_is_current(ref):
+            return {"frame": ref.seq, "stale": True}  # Torn: overwritten while reading
+        return {"frame": ref.seq, "stale": False, "mean": mean}
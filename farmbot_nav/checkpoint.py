@@ -0,0 +1,102 @@
+"""
+Navigation checkpoints for resumable runs.
+
+Snapshots of the navigation state are written with write-to-temp, fsync and
+rename, so a reboot mid-write leaves either the old or the new checkpoint,
+never a torn file. Writes happen on a background thread; the control loop
+only hands over a small dict.
+"""
+import json
+import os
+import tempfile
+import threading
+
+def atomic_write_json(path, obj):
+    """Write ``obj`` as JSON to ``path`` atomically (temp file + os.replace)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".ckpt-", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(obj, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    # Persist the rename itself (directory entry) where the OS allows it.
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+def load_checkpoint(path):
+    """Return the saved state dict, or None if there is no usable checkpoint."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+class Checkpointer:
+    """
+    Periodic checkpoint writer.
+
+    ``due(tick)`` is a cheap test for the control loop; ``save(state)``
+    hands the snapshot to the writer thread. If the writer falls behind,
+    only the newest snapshot is kept.
+    """
+
+    def __init__(self, path, interval=60):
+        self.path = path
+        self.interval = interval  # ticks between periodic checkpoints
+        self.saves = 0
+        self._last_tick = 0
+        self._latest = None
+        self._closing = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._writer, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def due(self, tick):
+        return tick - self._last_tick >= self.interval
+
+    def save(self, state, tick=None):
+        if tick is not None:
+            self._last_tick = tick
+        with self._cond:
+            self._latest = state
+            self._cond.notify()
+
+    def _writer(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._latest is not None or self._closing)
+                state, self._latest = self._latest, None
+                if state is None:
+                    return
+            atomic_write_json(self.path, state)
+            self.saves += 1
+
+    def clear(self):
+        """Drop the checkpoint once a run has completed."""
+        with self._cond:
+            self._latest = None
+        self.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        """Write out the last pending snapshot and stop the writer thread."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join()
@@ -0,0 +1,65 @@
+"""
+Lazily initialized pygame display.
+
+pygame is imported, and only its display and font modules are initialized,
+the first time a run actually draws. ``pygame.init()`` would also start
+audio, joystick and other subsystems the nav scripts never use. Fonts are
+created once and cached instead of once per frame.
+"""
+
+class Display:
+    """Window, font cache and clock, created on first use."""
+
+    def __init__(self, width=800, height=400, caption="Farmbot Navigation Simulation"):
+        self.size = (width, height)
+        self.caption = caption
+        self._pygame = None
+        self._screen = None
+        self._fonts = {}
+        self._clock = None
+
+    @property
+    def pygame(self):
+        if self._pygame is None:
+            import pygame
+            pygame.display.init()
+            self._pygame = pygame
+        return self._pygame
+
+    @property
+    def initialized(self):
+        return self._screen is not None
+
+    @property
+    def screen(self):
+        if self._screen is None:
+            pygame = self.pygame
+            self._screen = pygame.display.set_mode(self.size)
+            pygame.display.set_caption(self.caption)
+        return self._screen
+
+    def font(self, size=24, name=None):
+        key = (name, size)
+        font = self._fonts.get(key)
+        if font is None:
+            pygame = self.pygame
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = self._fonts[key] = pygame.font.SysFont(name, size)
+        return font
+
+    def text(self, message, pos, size=24, color=(0, 0, 0)):
+        self.screen.blit(self.font(size).render(message, True, color), pos)
+
+    @property
+    def clock(self):
+        if self._clock is None:
+            self._clock = self.pygame.time.Clock()
+        return self._clock
+
+    def close(self):
+        if self._pygame is not None:
+            self._pygame.quit()
+            self._pygame = None
+            self._screen = None
+            self._fonts.clear()
@@ -0,0 +1,462 @@
+"""
+Headless navigation engine shared by every navigation mode.
+
+The engine owns the bot pose, the checked-plant state and the motor core;
+a strategy (see ``strategies.py``) supplies the state machine for one
+route. ``step()`` runs one tick without touching pygame, so the same code
+drives the GUI, the robot and batch simulations.
+"""
+from logging import DEBUG, INFO, WARNING
+
+from farmbot_nav.hardware import MotorBackend
+from farmbot_nav.localization import PoseFilter
+from farmbot_nav.obstacles import ObstacleGuard, ObstacleMap, SimulatedRangeSensor
+from farmbot_nav.plant_set import PlantSet
+from farmbot_nav.tags import TagRegistry
+
+# --------------------------
+# Configuration
+# --------------------------
+class NavConfig:
+    """Speeds, thresholds and timings (defaults are those of the original scripts)."""
+
+    def __init__(self, speed=2, check_distance=20, check_duration=30,
+                 tick_seconds=0.03, turn_seconds=1.0, turn_180_seconds=2.0,
+                 paired_checks=False, sensor_range=60, stop_distance=25, reroute_after=30,
+                 localize=False, drift_variance=0.1, tag_variance=4.0, odometry_scale=1.0):
+        self.speed = speed                        # Pixels per tick
+        self.check_distance = check_distance      # Plant / RFID detection threshold
+        self.check_duration = check_duration      # Ticks to "check" a plant
+        self.tick_seconds = tick_seconds          # Simulated time per tick
+        self.turn_seconds = turn_seconds          # Point turn duration
+        self.turn_180_seconds = turn_180_seconds  # Spin duration for a 180-degree turn
+        self.paired_checks = paired_checks        # One stop for the plants at the same x in both rows
+        self.sensor_range = sensor_range          # Forward range sensor reach
+        self.stop_distance = stop_distance        # Stop for an obstacle this close
+        self.reroute_after = reroute_after        # Blocked ticks before asking for a reroute (0: wait)
+        self.localize = localize                  # Kalman-correct the pose at every lane tag read
+        self.drift_variance = drift_variance      # Pose variance added per pixel driven
+        self.tag_variance = tag_variance          # Variance of a tag read across the direction of travel
+        self.odometry_scale = odometry_scale      # Simulated distance driven per commanded pixel
+
+    def as_dict(self):
+        return dict(vars(self))
+
+class Field:
+    """
+    Field layout: plant rows driven in pairs ("row groups"), one lane per
+    group halfway between its two rows, and RFID tags at the lane ends.
+
+    Tags are ordered as in the original scripts: the right end of the first
+    lane, then the left and right ends of every following lane. ``tags``
+    adds tags or tag actions (see tags.py). Obstacles are
+    (x, y, radius[, kind]) circles.
+    """
+
+    def __init__(self, row_positions=(100, 150, 200, 250), plants_per_row=6,
+                 plant_spacing=100, first_plant_x=100, left_x=50, right_x=650,
+                 plants=None, obstacles=(), tags=()):
+        self.row_positions = list(row_positions)
+        self.plant_spacing = plant_spacing
+        self.first_plant_x = first_plant_x
+        self.left_x = left_x
+        self.right_x = right_x
+        if plants is None:
+            plants = [[(first_plant_x + i * plant_spacing, y) for i in range(plants_per_row)]
+                      for y in self.row_positions]
+        self.plants = [list(row) for row in plants]
+        self.obstacles = [tuple(o) for o in obstacles]
+        self.tags = [dict(t) for t in tags]
+        gap = (self.row_positions[1] - self.row_positions[0]) if len(self.row_positions) > 1 else 50
+        self.lanes = []
+        for g in range(0, len(self.row_positions), 2):
+            rows = self.row_positions[g:g + 2]
+            self.lanes.append((rows[0] + rows[1]) // 2 if len(rows) == 2 else rows[0] + gap // 2)
+        self.rfid_positions = [(right_x, self.lanes[0])]
+        for lane in self.lanes[1:]:
+            self.rfid_positions += [(left_x, lane), (right_x, lane)]
+        self.start_pos = (left_x, self.lanes[0])
+
+    def bounds(self, margin=0):
+        """(x0, y0, x1, y1) around the tags, rows and obstacles, padded by ``margin``."""
+        xs = [self.left_x, self.right_x] + [o[0] for o in self.obstacles]
+        ys = self.row_positions + self.lanes + [o[1] for o in self.obstacles]
+        return (min(xs) - margin, min(ys) - margin, max(xs) + margin, max(ys) + margin)
+
+    @property
+    def groups(self):
+        return len(self.lanes)
+
+    def group_rows(self, group):
+        """Row indices scanned while driving the lane of ``group``."""
+        return range(2 * group, min(2 * group + 2, len(self.row_positions)))
+
+    def tag(self, group, side):
+        """Index into ``rfid_positions`` of the tag at ``side`` ("left"/"right") of a lane."""
+        if group == 0:
+            if side != "right":
+                raise ValueError("the first lane only has a right-hand tag")
+            return 0
+        return 2 * group - 1 + (side == "right")
+
+    def to_dict(self):
+        return {"row_positions": self.row_positions, "plants": self.plants,
+                "plant_spacing": self.plant_spacing, "first_plant_x": self.first_plant_x,
+                "left_x": self.left_x, "right_x": self.right_x, "obstacles": self.obstacles,
+                "tags": self.tags}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(row_positions=data["row_positions"], plants=data["plants"],
+                   plant_spacing=data.get("plant_spacing", 100),
+                   first_plant_x=data.get("first_plant_x", 100),
+                   left_x=data["left_x"], right_x=data["right_x"],
+                   obstacles=data.get("obstacles", ()), tags=data.get("tags", ()))
+
+# --------------------------
+# Motor Core
+# --------------------------
+class Motors:
+    """
+    Named motor commands on a MotorBackend.
+
+    ``mapping`` gives the (7, 11, 13, 15) levels for each command. Repeating
+    the command already applied does not rewrite the pins, which removes
+    four GPIO writes per tick while driving straight. With a ``scheduler``
+    (motor_scheduler.MotorScheduler), timed commands are started and
+    stopped at exact deadlines instead of around a sleep.
+    """
+
+    def __init__(self, backend, mapping, sleep=None, scheduler=None):
+        self.backend = backend
+        self.mapping = dict(mapping)
+        self.sleep = sleep  # None: turns take simulated time only
+        self.scheduler = scheduler
+        self.current = None
+
+    def command(self, name):
+        if name != self.current:
+            self.backend.set(*self.mapping[name])
+            self.current = name
+
+    def stop(self):
+        if self.current != "stop":
+            self.backend.stop()
+            self.current = "stop"
+
+    def timed(self, name, seconds):
+        """Run ``name`` for ``seconds`` and stop (a point turn)."""
+        if self.scheduler is not None and self.sleep is not None:
+            command = self.scheduler.timed(self.mapping[name], seconds, name)
+            self.current = name
+            self.sleep(seconds)
+            # The scheduler thread writes the stop at the deadline; the sleep only waits for it
+            if not command.wait(seconds + 1.0):
+                self.backend.stop()
+            self.current = "stop"
+            return
+        self.command(name)
+        if self.sleep is not None:
+            self.sleep(seconds)
+        self.stop()
+
+# --------------------------
+# Engine
+# --------------------------
+class NavEngine:
+    """
+    One navigation run over a Field.
+
+    Listeners registered with ``add_listener`` receive
+    ``(engine, level, event, fields)`` for every event the strategy emits
+    (RFID reads, turns, checked plants, completion). ``motor_map``
+    overrides the strategy's pin levels for robots wired differently.
+    ``sensor`` is a forward range sensor; by default one is simulated from
+    the field's obstacles, if it has any. With a ``field_map``
+    (mapping.OccupancyGrid) the route modes plan headland transitions
+    around known obstacles, reusing paths from ``path_cache``. ``noise``
+    (noise.NoiseModel) adds detection, RFID, odometry and inspection noise.
+    ``scheduler`` times turns on the motors (see Motors).
+    """
+
+    def __init__(self, field=None, mode="point_turn", config=None, backend=None, sleep=None,
+                 motor_map=None, sensor=None, field_map=None, path_cache=None, noise=None,
+                 scheduler=None):
+        from farmbot_nav.strategies import STRATEGIES
+        self.field = field or Field()
+        self.config = config or NavConfig()
+        self.mode = mode
+        self.field_map = field_map
+        self.path_cache = path_cache
+        self.noise = noise
+        self.strategy = STRATEGIES[mode](self)
+        if backend is None:
+            backend = MotorBackend(simulate=True)
+        self.motors = Motors(backend, motor_map or self.strategy.motor_map, sleep, scheduler)
+        self.plants = PlantSet(self.field.plants)
+        self.tags = TagRegistry.for_field(self.field, self.config.check_distance,
+                                          lane_actions=("localize",) if self.config.localize else ())
+        self.localizer = PoseFilter(self.config.drift_variance, self.config.tag_variance)
+        self.last_move = (0, 0)
+        self._tag_in_range = None
+        self._tag_reads = []  # (tick due, tag ID, pose, last move) reads not yet handed to the strategy
+        self._read = None  # (pose, last move) when the read being dispatched was taken
+        self._look_tick = -1  # Tick of the last find_plant
+        if sensor is None and self.field.obstacles:
+            sensor = SimulatedRangeSensor(ObstacleMap(self.field.obstacles), self.config.sensor_range)
+        self.guard = None
+        if sensor is not None:
+            self.guard = ObstacleGuard(sensor, self.config.stop_distance, self.config.reroute_after)
+        self.pos = list(self.field.start_pos)  # Dead-reckoned (and tag-corrected) estimate
+        self.true_pos = list(self.pos)  # Simulated ground truth (odometry_scale)
+        self.direction = self.strategy.initial_state
+        self.group = 0
+        self.flags = {}
+        self.check_timer = 0
+        self.check_ticks = self.config.check_duration  # Dwell of the current inspection
+        self.current_plant = None
+        self.check_indices = []  # Plants inspected at the current stop
+        self.paired = self.config.paired_checks or self.strategy.paired_checks
+        self.resume_state = None
+        self.tick = 0
+        self.sim_time = 0.0
+        self.plant_stops = 0
+        self.done = False
+        self._listeners = []
+        self._tick_listeners = []
+
+    # --------------------------
+    # Events
+    # --------------------------
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def add_tick_listener(self, callback):
+        """``callback(engine)`` runs after every tick (e.g. to map the path driven)."""
+        self._tick_listeners.append(callback)
+
+    def emit(self, level, event, **fields):
+        for callback in self._listeners:
+            callback(self, level, event, fields)
+
+    # --------------------------
+    # Ticking
+    # --------------------------
+    def step(self):
+        """Advance the run by one tick."""
+        if self.done:
+            return
+        self.tick += 1
+        self.sim_time += self.config.tick_seconds
+        check_state = self.strategy.check_state
+        checking = self.direction == check_state
+        self.strategy.handlers[self.direction]()
+        # Reads wait out an inspection stop, including the tick it ends in, so
+        # a lane end never cuts a check short and the check resumes its state
+        if self._tag_reads and not checking and self.direction != check_state:
+            self._dispatch_tags()
+        for callback in self._tick_listeners:
+            callback(self)
+
+    def run(self, max_ticks=None):
+        """Step until the run completes (or ``max_ticks``). Returns True if it completed."""
+        step = self.step
+        while not self.done:
+            if max_ticks is not None and self.tick >= max_ticks:
+                return False
+            step()
+        return True
+
+    # --------------------------
+    # Shared Core Used by Strategies
+    # --------------------------
+    def drive(self, command, dx=0, dy=0):
+        """Move by (dx, dy) unless an obstacle blocks the way; returns True if the bot moved."""
+        if self.guard is not None and self.guard.blocks(self, dx, dy):
+            return False
+        self.motors.command(command)
+        self.pos[0] += dx
+        self.pos[1] += dy
+        scale = self.config.odometry_scale
+        if self.noise is not None:
+            scale *= self.noise.odometry()
+        self.true_pos[0] += dx * scale
+        self.true_pos[1] += dy * scale
+        self.localizer.predict(dx, dy)
+        self.last_move = (dx, dy)
+        self._read_tags()
+        return True
+
+    def _read_tags(self):
+        """Simulated RFID reader at the true position: each tag is read once per pass, as the bot comes into range."""
+        x, y = self.true_pos
+        if self._tag_in_range is not None:
+            # A pass ends well clear of the tag, so reader jitter at the edge of
+            # the range does not read it again (and localize from it again)
+            last = self.tags.get(self._tag_in_range)
+            clear = 2 * self.tags.read_range
+            if last is None or abs(last.x - x) >= clear or abs(last.y - y) >= clear:
+                self._tag_in_range = None
+        delay = 0
+        if self.noise is not None:
+            x += self.noise.rfid_offset()
+            delay = self.noise.rfid_latency
+        tag = self.tags.read(x, y)
+        if tag is not None and self.noise is not None and self.noise.tag_dropped():
+            return  # Lost this tick; the reader tries again on the next
+        if tag is not None and tag.tag_id != self._tag_in_range:
+            self._tag_in_range = tag.tag_id
+            self.on_tag_read(tag.tag_id, delay)
+
+    def on_tag_read(self, tag_id, delay=0):
+        """
+        Queue a read of ``tag_id`` (from the reader). Its actions go to the
+        strategy at the end of the tick ``delay`` ticks from now.
+        """
+        self._tag_reads.append((self.tick + delay, tag_id, tuple(self.pos), self.last_move))
+
+    def _dispatch_tags(self):
+        due = [read for read in self._tag_reads if read[0] <= self.tick]
+        if not due:
+            return
+        self._tag_reads = [read for read in self._tag_reads if read[0] > self.tick]
+        for _, tag_id, pos, move in due:
+            tag = self.tags.get(tag_id)
+            if tag is None:
+                self.emit(WARNING, "unknown_tag", tag_id=tag_id)
+                continue
+            self.emit(DEBUG, "tag_read", tag_id=tag_id, actions=[name for name, _ in tag.actions])
+            self._read = (pos, move)
+            try:
+                for name, arg in tag.actions:
+                    if self.done:
+                        return
+                    self.strategy.on_tag(tag, name, arg)
+            finally:
+                self._read = None
+
+    def stop(self):
+        self.motors.stop()
+
+    def turn(self, command, seconds):
+        self.motors.timed(command, seconds)
+        self.sim_time += seconds
+
+    def localize(self, tag):
+        """Kalman-correct the pose from a read of ``tag``; emits the residual found."""
+        read_pos, (dx, dy) = self._read or (self.pos, self.last_move)
+        direction = ((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))
+        measured, variances = self.localizer.measurement(
+            (tag.x, tag.y), direction, self.tags.read_range, self.config.speed, read_pos)
+        # A late read places the bot where the reader fired; carry that over the distance driven since
+        measured = (measured[0] + self.pos[0] - read_pos[0], measured[1] + self.pos[1] - read_pos[1])
+        residual = self.localizer.update(self.pos, measured, variances)
+        self.emit(DEBUG, "localized", tag_id=tag.tag_id,
+                  residual=(round(residual[0], 2), round(residual[1], 2)))
+
+    def scan(self, command, dx, resume_state):
+        """One tick along a lane: drive ``dx`` and stop for the first unchecked plant in range."""
+        if self.look_first(resume_state):
+            return
+        self.drive(command, dx=dx)
+        index = self.find_plant()
+        if index >= 0:
+            self.begin_check(index, resume_state)
+
+    def look_first(self, resume_state):
+        """
+        On the first tick of a scan (a lane start, or after a turn), check for
+        a plant in range before moving, so a plant behind the start point is
+        not left behind. Returns True if a check began.
+        """
+        if self._look_tick == self.tick - 1:
+            return False  # Looked here last tick
+        index = self.find_plant()
+        if index < 0:
+            return False
+        self.begin_check(index, resume_state)
+        return True
+
+    def find_plant(self):
+        """Index of an unchecked plant beside the bot in the current group, or -1."""
+        self._look_tick = self.tick
+        if self.noise is not None:
+            return self.noise.detect_plant(self, self.field.group_rows(self.group))
+        return self.plants.first_unchecked_near(
+            self.pos[0], self.field.group_rows(self.group), self.config.check_distance)
+
+    def begin_check(self, index, resume_state):
+        """
+        Stop to inspect plant ``index``. With paired checks the stop also
+        covers every unchecked plant at the same x in the other row of the
+        pair; each row is on its own sensor (``sensor`` in "plant_checked").
+        """
+        self.stop()
+        self.resume_state = resume_state
+        self.direction = self.strategy.check_state
+        self._select(index)
+
+    def _select(self, index):
+        self.plant_stops += 1  # One inspection dwell, whether or not the bot moved since the last
+        self.current_plant = self.plants.coords(index)
+        self.check_timer = 0
+        if self.noise is not None:
+            self.check_ticks = self.noise.inspection_ticks(self.config.check_duration)
+        if self.paired:
+            self.check_indices = self.plants.unchecked_near(
+                self.current_plant[0], self.field.group_rows(self.group), self.config.check_distance)
+        else:
+            self.check_indices = [index]
+
+    def finish_check(self):
+        """Mark the stop's plants checked, then check the next plant in range or resume."""
+        for index in self.check_indices:
+            self.plants.mark(index)
+            self.emit(DEBUG, "plant_checked", plant=self.plants.coords(index),
+                      sensor=int(self.plants.row[index]) % 2)
+        # Closely spaced plants can share a stop; resuming first would drive past them
+        index = self.find_plant()
+        if index >= 0:
+            self._select(index)
+        else:
+            self.check_timer = 0
+            self.direction = self.resume_state
+
+    def complete(self, tag):
+        self.stop()
+        self.done = True
+        self.emit(INFO, "run_completed", tag=tag, plants_checked=len(self.plants))
+
+    # --------------------------
+    # Checkpointing
+    # --------------------------
+    def snapshot(self):
+        """JSON-friendly state for checkpoints."""
+        return {
+            "tick": self.tick,
+            "mode": self.mode,
+            "pos": list(self.pos),
+            "direction": self.direction,
+            "group": self.group,
+            "flags": dict(self.flags),
+            "resume_state": self.resume_state,
+            "check_indices": list(self.check_indices),
+            "checked_plants": self.plants.to_bits(),
+        }
+
+    def restore(self, state, checked=True):
+        self.pos = list(state["pos"])
+        self.true_pos = list(self.pos)
+        self.direction = state["direction"]
+        self.group = state["group"]
+        self.flags = dict(state["flags"])
+        self.resume_state = state.get("resume_state")
+        self.check_indices = list(state.get("check_indices", ()))
+        if checked:
+            self.plants.load_bits(state["checked_plants"])
+
+def simulate(field=None, mode="point_turn", config=None, max_ticks=200000, noise=None):
+    """Run a headless simulation and return the finished engine."""
+    engine = NavEngine(field, mode, config, noise=noise)
+    engine.run(max_ticks)
+    return engine
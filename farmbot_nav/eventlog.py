@@ -0,0 +1,174 @@
+"""
+Structured, buffered event logging for the control loop.
+
+Every event has the same schema: tick, time, level, state, event name,
+position (x, y) and optional extra fields. The loop only appends a tuple to
+a bounded in-memory buffer; a background thread formats and writes events
+to the sinks. A disabled level costs one integer comparison.
+"""
+import collections
+import json
+import struct
+import sys
+import threading
+import time
+from logging import DEBUG, ERROR, INFO, WARNING, getLevelName
+
+FIELDS = ("tick", "time", "level", "state", "event", "x", "y")
+
+# --------------------------
+# Sinks
+# --------------------------
+class JsonlSink:
+    """One JSON object per line."""
+
+    def __init__(self, path):
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, records):
+        for tick, stamp, level, state, event, x, y, extra in records:
+            record = {"tick": tick, "time": stamp, "level": getLevelName(level),
+                      "state": state, "event": event, "x": x, "y": y}
+            if extra:
+                record.update(extra)
+            self._file.write(json.dumps(record, separators=(",", ":"), default=str))
+            self._file.write("\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class TextSink:
+    """Human-readable lines for a console (written off the control loop)."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def write(self, records):
+        for tick, stamp, level, state, event, x, y, extra in records:
+            details = " ".join(f"{k}={v}" for k, v in extra.items()) if extra else ""
+            self.stream.write(f"[{tick:>6}] {getLevelName(level):<7} {state:<18} {event} "
+                              f"@({x:.0f},{y:.0f}) {details}\n")
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+# Binary record: tick, time, level, x, y, then length-prefixed state, event and
+# JSON-encoded extra fields.
+_BINARY_HEAD = struct.Struct("<IdBffBBH")
+
+class BinarySink:
+    """Compact fixed-header binary records; read back with ``read_binary``."""
+
+    def __init__(self, path):
+        self._file = open(path, "ab")
+
+    def write(self, records):
+        chunks = []
+        for tick, stamp, level, state, event, x, y, extra in records:
+            state_b = state.encode("utf-8")[:255]
+            event_b = event.encode("utf-8")[:255]
+            extra_b = json.dumps(extra, separators=(",", ":"), default=str).encode() if extra else b""
+            chunks.append(_BINARY_HEAD.pack(tick & 0xFFFFFFFF, stamp, level, x, y,
+                                            len(state_b), len(event_b), len(extra_b)))
+            chunks += (state_b, event_b, extra_b)
+        self._file.write(b"".join(chunks))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+def read_binary(path):
+    """Yield event dicts from a file written by BinarySink."""
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset < len(data):
+        tick, stamp, level, x, y, ls, le, lx = _BINARY_HEAD.unpack_from(data, offset)
+        offset += _BINARY_HEAD.size
+        state = data[offset:offset + ls].decode("utf-8")
+        event = data[offset + ls:offset + ls + le].decode("utf-8")
+        extra = data[offset + ls + le:offset + ls + le + lx]
+        offset += ls + le + lx
+        record = {"tick": tick, "time": stamp, "level": getLevelName(level),
+                  "state": state, "event": event, "x": x, "y": y}
+        if extra:
+            record.update(json.loads(extra))
+        yield record
+
+# --------------------------
+# Event Log
+# --------------------------
+class EventLog:
+    """
+    Bounded, background-flushed event log.
+
+    If the writer falls behind, the oldest unwritten events are dropped
+    (counted in ``dropped``) rather than blocking the control loop.
+    """
+
+    def __init__(self, sinks, level=INFO, capacity=4096, flush_interval=0.05):
+        self.sinks = list(sinks)
+        self.level = level
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.emitted = 0
+        self.written = 0
+        self._buffer = collections.deque(maxlen=capacity)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+
+    @property
+    def dropped(self):
+        return self.emitted - self.written - len(self._buffer)
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def emit(self, level, event, tick, state, pos, **extra):
+        if level < self.level:
+            return
+        self.emitted += 1
+        self._buffer.append((tick, time.time(), level, state, event,
+                             float(pos[0]), float(pos[1]), extra))
+
+    def debug(self, event, tick, state, pos, **extra):
+        if DEBUG >= self.level:
+            self.emit(DEBUG, event, tick, state, pos, **extra)
+
+    def info(self, event, tick, state, pos, **extra):
+        if INFO >= self.level:
+            self.emit(INFO, event, tick, state, pos, **extra)
+
+    def warning(self, event, tick, state, pos, **extra):
+        if WARNING >= self.level:
+            self.emit(WARNING, event, tick, state, pos, **extra)
+
+    def error(self, event, tick, state, pos, **extra):
+        self.emit(ERROR, event, tick, state, pos, **extra)
+
+    def _flush(self):
+        records = []
+        while True:
+            try:
+                records.append(self._buffer.popleft())
+            except IndexError:
+                break
+        if records:
+            for sink in self.sinks:
+                sink.write(records)
+            self.written += len(records)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self._flush()
+        self._flush()
+
+    def close(self):
+        """Write everything still buffered and close the sinks."""
+        self._stop.set()
+        self._thread.join()
+        for sink in self.sinks:
+            sink.close()
@@ -0,0 +1,351 @@
+"""
+Multi-field job scheduler for a fleet of bots.
+
+Every FieldJob gets a duration estimate from the headless simulator (one
+run per distinct field, mode and config). The jobs are then assigned to
+robots to minimize the time the last robot finishes: longest job first
+onto the robot that would finish it earliest, then a pass of moves and
+swaps off the busiest robot. Robots may have different speeds.
+
+FleetScheduler is event driven. A robot asks ``next_job`` when it is
+free, and reports ``finished`` or ``failed``. Every report re-plans the
+jobs that have not started from the robots' actual free times, and the
+job of a failed robot goes back into the queue. ``simulate_fleet``
+replays a whole day offline with noisy durations and injected failures::
+
+    python -m farmbot_nav.fleet --fields 20 --robots 3 --fail 1@300
+    python -m farmbot_nav.fleet --jobs jobs.json --robots 4
+"""
+import argparse
+import heapq
+import json
+import multiprocessing
+import random
+
+from farmbot_nav.engine import Field, NavConfig, simulate
+
+class FieldJob:
+    """One field to cover: ``field`` (engine.Field) driven in ``mode``."""
+
+    def __init__(self, name, field=None, mode="optimized", config=None):
+        self.name = name
+        self.field = field or Field()
+        self.mode = mode
+        self.config = config or NavConfig()
+        self.estimate = None  # Simulated seconds, set by estimate_jobs()
+
+    def key(self):
+        """Identifies jobs with the same field, mode and config (they share an estimate)."""
+        return json.dumps([self.field.to_dict(), self.mode, self.config.as_dict()], sort_keys=True)
+
+    def to_dict(self):
+        return {"name": self.name, "mode": self.mode, "field": self.field.to_dict(),
+                "config": self.config.as_dict()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], Field.from_dict(data["field"]), data.get("mode", "optimized"),
+                   NavConfig(**data.get("config", {})))
+
+    def __repr__(self):
+        return f"FieldJob({self.name!r}, {self.mode})"
+
+class Robot:
+    """A bot of the fleet; ``speed`` scales its job durations (2.0 finishes in half the time)."""
+
+    def __init__(self, name, speed=1.0):
+        self.name = name
+        self.speed = speed
+        self.failed = False
+
+    def duration(self, job):
+        return job.estimate / self.speed
+
+    def __repr__(self):
+        return f"Robot({self.name!r})"
+
+# --------------------------
+# Estimates
+# --------------------------
+def _simulate_job(args):
+    field, mode, config = args
+    engine = simulate(field, mode, config)
+    return engine.sim_time if engine.done else None
+
+def estimate_jobs(jobs, workers=1, cache=None):
+    """Set ``job.estimate`` from the simulator; ``cache`` (dict by job key) is reused and filled."""
+    cache = {} if cache is None else cache
+    todo = {}
+    for job in jobs:
+        key = job.key()
+        if key not in cache:
+            todo[key] = (job.field, job.mode, job.config)
+    if workers > 1 and len(todo) > 1:
+        with multiprocessing.Pool(workers) as pool:
+            seconds = pool.map(_simulate_job, todo.values())
+    else:
+        seconds = map(_simulate_job, todo.values())
+    cache.update(zip(todo, seconds))
+    for job in jobs:
+        job.estimate = cache[job.key()]
+        if job.estimate is None:
+            raise ValueError(f"job {job.name} does not complete in simulation")
+    return cache
+
+# --------------------------
+# Assignment
+# --------------------------
+def assign(jobs, robots, free_at):
+    """
+    {robot name: [jobs]} for the queued ``jobs`` given when each robot is
+    next free (``free_at``: name -> seconds): longest job first onto the
+    robot that finishes it earliest, then improving moves and swaps.
+    """
+    queues = {robot.name: [] for robot in robots}
+    ends = {robot.name: free_at[robot.name] for robot in robots}
+    by_name = {robot.name: robot for robot in robots}
+    for job in sorted(jobs, key=lambda j: (-j.estimate, j.name)):
+        name = min(ends, key=lambda n: (ends[n] + by_name[n].duration(job), n))
+        queues[name].append(job)
+        ends[name] += by_name[name].duration(job)
+
+    # Local search: move or swap a job off the robot that finishes last while that helps
+    improved = True
+    while improved and len(robots) > 1:
+        improved = False
+        worst = max(ends, key=ends.get)
+        for job in list(queues[worst]):
+            for name in queues:
+                if name == worst:
+                    continue
+                new_worst = ends[worst] - by_name[worst].duration(job)
+                new_other = ends[name] + by_name[name].duration(job)
+                if max(new_worst, new_other) < ends[worst] - 1e-9:
+                    queues[worst].remove(job)
+                    queues[name].append(job)
+                    ends[worst], ends[name] = new_worst, new_other
+                    improved = True
+                    break
+                for other in queues[name]:
+                    new_worst = (ends[worst] - by_name[worst].duration(job)
+                                 + by_name[worst].duration(other))
+                    new_other = (ends[name] - by_name[name].duration(other)
+                                 + by_name[name].duration(job))
+                    if max(new_worst, new_other) < ends[worst] - 1e-9:
+                        queues[worst].remove(job)
+                        queues[name].remove(other)
+                        queues[worst].append(other)
+                        queues[name].append(job)
+                        ends[worst], ends[name] = new_worst, new_other
+                        improved = True
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+    for name in queues:
+        queues[name].sort(key=lambda j: (-j.estimate, j.name))
+    return queues, ends
+
+# --------------------------
+# Scheduler
+# --------------------------
+class FleetScheduler:
+    """
+    Hands out field jobs to robots and re-plans on every report. Times are
+    seconds from the start of the day (``now``), as the caller counts them.
+    """
+
+    def __init__(self, robots, jobs=(), workers=1):
+        self.robots = {robot.name: robot for robot in robots}
+        self.workers = workers
+        self.estimates = {}
+        self.pending = []
+        self.running = {}  # robot name -> (job, start)
+        self.done = []  # (job, robot name, start, end)
+        self.queues = {}
+        self.expected_end = {}
+        self.replans = 0
+        if jobs:
+            self.submit(jobs)
+
+    @property
+    def active(self):
+        return [r for r in self.robots.values() if not r.failed]
+
+    def submit(self, jobs, now=0.0):
+        """Add jobs to the queue (estimating them first) and re-plan."""
+        jobs = list(jobs)
+        estimate_jobs(jobs, self.workers, self.estimates)
+        self.pending += jobs
+        self.replan(now)
+
+    def replan(self, now):
+        """Assign every job that has not started, from each working robot's expected free time."""
+        free_at = {}
+        for robot in self.active:
+            if robot.name in self.running:
+                job, start = self.running[robot.name]
+                free_at[robot.name] = max(now, start + robot.duration(job))
+            else:
+                free_at[robot.name] = now
+        if not free_at:
+            self.queues, self.expected_end = {}, {}
+            return
+        self.queues, self.expected_end = assign(self.pending, self.active, free_at)
+        self.replans += 1
+
+    @property
+    def expected_makespan(self):
+        return max(self.expected_end.values(), default=0.0)
+
+    def next_job(self, robot_name, now):
+        """The job ``robot_name`` should start now, or None if it has nothing left."""
+        queue = self.queues.get(robot_name)
+        if not queue or self.robots[robot_name].failed:
+            return None
+        job = queue.pop(0)
+        self.pending.remove(job)
+        self.running[robot_name] = (job, now)
+        return job
+
+    def finished(self, robot_name, now):
+        """``robot_name`` completed its job at ``now``; returns the job."""
+        job, start = self.running.pop(robot_name)
+        self.done.append((job, robot_name, start, now))
+        self.replan(now)
+        return job
+
+    def failed(self, robot_name, now):
+        """``robot_name`` is out of service; its current job (returned) is queued again."""
+        self.robots[robot_name].failed = True
+        job = None
+        if robot_name in self.running:
+            job, _ = self.running.pop(robot_name)
+            self.pending.append(job)
+        self.replan(now)
+        return job
+
+    def describe(self):
+        lines = []
+        for name, queue in sorted(self.queues.items()):
+            jobs = " ".join(f"{j.name}({j.estimate:.0f}s)" for j in queue)
+            lines.append(f"{name:<8} until {self.expected_end[name]:7.1f}s: {jobs or '-'}")
+        return "\n".join(lines)
+
+# --------------------------
+# Offline Evaluation
+# --------------------------
+def simulate_fleet(jobs, robots, seed=0, noise=0.1, failures=(), workers=1):
+    """
+    Run a day offline: each job takes its estimate times a random factor in
+    ``1 +- noise``; ``failures`` is a list of (robot name, seconds). Returns
+    (scheduler, planned makespan, actual makespan, log of (seconds, event,
+    robot, job name)).
+    """
+    rng = random.Random(seed)
+    scheduler = FleetScheduler(robots, workers=workers)
+    scheduler.submit(jobs)
+    planned = scheduler.expected_makespan
+    events, counter, log = [], 0, []
+    for name, at in failures:
+        if name not in scheduler.robots:
+            raise ValueError(f"cannot fail unknown robot {name!r}")
+        heapq.heappush(events, (at, counter, "failed", name, None))
+        counter += 1
+
+    def dispatch(name, now):
+        nonlocal counter
+        job = scheduler.next_job(name, now)
+        if job is not None:
+            actual = scheduler.robots[name].duration(job) * rng.uniform(1 - noise, 1 + noise)
+            heapq.heappush(events, (now + actual, counter, "finished", name, job))
+            counter += 1
+            log.append((now, "started", name, job.name))
+
+    def dispatch_idle(now):
+        for robot in scheduler.active:
+            if robot.name not in scheduler.running:
+                dispatch(robot.name, now)
+
+    dispatch_idle(0.0)
+    now = 0.0
+    while events:
+        now, _, kind, name, job = heapq.heappop(events)
+        if kind == "finished":
+            running = scheduler.running.get(name)
+            if running is None or running[0] is not job:
+                continue  # The robot failed during this job
+            scheduler.finished(name, now)
+            log.append((now, "finished", name, job.name))
+        else:
+            lost = scheduler.failed(name, now)
+            log.append((now, "failed", name, lost.name if lost else None))
+        dispatch_idle(now)
+    if scheduler.pending:
+        raise RuntimeError(f"{len(scheduler.pending)} jobs left with no working robot")
+    makespan = max((end for _, _, _, end in scheduler.done), default=0.0)
+    return scheduler, planned, makespan, log
+
+def random_jobs(count, seed=0):
+    """``count`` jobs on random field layouts (for trying the scheduler)."""
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        rows = rng.randint(2, 8)
+        gap = rng.choice((40, 50, 60))
+        field = Field(row_positions=[100 + r * gap for r in range(rows)],
+                      plants_per_row=rng.randint(2, 8), plant_spacing=rng.choice((60, 80, 100)),
+                      right_x=rng.choice((450, 650, 850)))
+        jobs.append(FieldJob(f"field-{i}", field, rng.choice(("optimized", "dual_sided"))))
+    return jobs
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="farmbot_nav.fleet", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--jobs", help="JSON list of jobs (FieldJob.to_dict format)")
+    parser.add_argument("--fields", type=int, default=12, help="random jobs when --jobs is not given")
+    parser.add_argument("--robots", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--noise", type=float, default=0.1, help="actual/estimated duration spread")
+    parser.add_argument("--fail", action="append", default=[], metavar="ROBOT@SECONDS",
+                        help="fail robot number ROBOT (0 .. robots-1) at SECONDS (repeatable)")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.jobs:
+        with open(args.jobs) as f:
+            jobs = [FieldJob.from_dict(d) for d in json.load(f)]
+    else:
+        jobs = random_jobs(args.fields, args.seed)
+    robots = [Robot(f"bot-{i}") for i in range(args.robots)]
+    failures = []
+    for spec in args.fail:
+        index, _, at = spec.partition("@")
+        try:
+            index, at = int(index), float(at)
+        except ValueError:
+            parser.error(f"--fail {spec!r}: expected ROBOT@SECONDS, e.g. 1@300")
+        if not 0 <= index < args.robots:
+            parser.error(f"--fail {spec!r}: no robot {index} (robots are 0 .. {args.robots - 1})")
+        if not at >= 0:
+            parser.error(f"--fail {spec!r}: SECONDS must be 0 or more")
+        failures.append((f"bot-{index}", at))
+
+    try:
+        scheduler, planned, makespan, log = simulate_fleet(jobs, robots, args.seed, args.noise,
+                                                           failures, args.workers)
+    except RuntimeError as exc:
+        print(exc)
+        return 1
+    if args.verbose:
+        for at, event, robot, name in log:
+            print(f"{at:8.1f}s {event:<9} {robot:<8} {name or ''}")
+    total = sum(job.estimate for job in jobs)
+    print(f"{len(jobs)} jobs, {total:.1f} s of driving on {len(robots)} robots: "
+          f"planned {planned:.1f} s, finished after {makespan:.1f} s "
+          f"(lower bound {total / len(robots):.1f} s), {scheduler.replans} re-plans")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,274 @@
+"""
+Property / fuzz harness for the navigation state machines.
+
+Each case builds a random field layout, speed and check distance from its
+seed, runs one mode headless within a tick budget and checks invariants:
+
+* the run terminates (``engine.done`` within the budget),
+* no plant is checked twice, and on a clean case every plant is checked,
+* every state change is an allowed transition for the mode, and a plant
+  check resumes the state it interrupted,
+* the bot stays inside the field: within two steps of the rows and
+  lane-end tags, or six on a noisy case, where late reads and drift carry
+  it a few steps on before it turns.
+
+Plants go anywhere between the lane-end tags. About half of the cases are
+clean; the rest add some of: a NoiseModel (detection, RFID, odometry and
+inspection noise), an odometry scale error, tag localization, extra tags
+with actions (``stop``, ``turn``, ``switch_group``, ``localize``) and
+obstacles beside the lane ends, which the range sensor sees but which
+never block the path. Noise and the tag actions that end a lane early or
+skip lanes may leave plants unchecked, so those cases only require that
+none is checked twice.
+
+Cases are independent and seeded, so a failure is reproduced from its
+seed alone. A case is a few hundred engine ticks, about 3 ms on one core
+(roughly 300 cases/s per worker). ``--workers`` defaults to the CPU count;
+a few thousand cases/s needs about 8 to 10 cores. Run it with::
+
+    python -m farmbot_nav.fuzz --cases 20000
+    python -m farmbot_nav.fuzz --seed 1234 --verbose   # replay one case
+"""
+import argparse
+import multiprocessing
+import random
+import time
+
+from farmbot_nav.engine import Field, NavConfig, NavEngine
+from farmbot_nav.hardware import FakeGPIO, MotorBackend
+from farmbot_nav.noise import NoiseModel
+from farmbot_nav.strategies import STRATEGIES
+
+_ROUTE = {"TURN", "TRANSIT", "SCAN"}
+
+# Allowed state changes per mode (staying in a state is always allowed)
+TRANSITIONS = {
+    "align": {
+        "FORWARD": {"CHECK_PLANT", "ALIGN_DOWN"},
+        "ALIGN_DOWN": {"MOVE_TO_RIGHT"},
+        "MOVE_TO_RIGHT": {"BACKWARD"},
+        "BACKWARD": {"CHECK_PLANT", "ALIGN_DOWN"},
+        "CHECK_PLANT": {"FORWARD", "BACKWARD"},
+    },
+    "point_turn": {
+        "FORWARD": {"CHECK_PLANT", "POINT_TURN_1"},
+        "POINT_TURN_1": {"MOVE_DOWN"},
+        "MOVE_DOWN": {"POINT_TURN_2"},
+        "POINT_TURN_2": {"FORWARD_TO_ROW_3"},
+        "FORWARD_TO_ROW_3": {"TURN_180"},
+        "TURN_180": {"FORWARD_ROWS_3_4"},
+        "FORWARD_ROWS_3_4": {"CHECK_PLANT", "POINT_TURN_1"},
+        "CHECK_PLANT": {"FORWARD", "FORWARD_ROWS_3_4"},
+    },
+    "two_sided": {
+        "FORWARD_ROWS_1_2": {"CHECK_PLANT", "POINT_TURN_LEFT"},
+        "FORWARD_ROWS_3_4": {"CHECK_PLANT", "POINT_TURN_LEFT"},
+        "POINT_TURN_LEFT": {"MOVE_DOWN_TO_RFID_2"},
+        "MOVE_DOWN_TO_RFID_2": {"POINT_TURN_RIGHT_TO_ROWS_3_4"},
+        "POINT_TURN_RIGHT_TO_ROWS_3_4": {"FORWARD_ROWS_1_2", "FORWARD_ROWS_3_4"},
+        "CHECK_PLANT": {"FORWARD_ROWS_1_2", "FORWARD_ROWS_3_4"},
+    },
+    "optimized": {
+        "TURN": _ROUTE,
+        "TRANSIT": _ROUTE,
+        "SCAN": _ROUTE | {"CHECK_PLANT"},
+        "CHECK_PLANT": {"SCAN"},
+    },
+}
+TRANSITIONS["dual_sided"] = TRANSITIONS["optimized"]
+
+class CaseFailure(AssertionError):
+    """An invariant did not hold; ``seed`` reproduces the case."""
+
+    def __init__(self, seed, message):
+        super().__init__(f"seed {seed}: {message}")
+        self.seed = seed
+
+# --------------------------
+# Case Generation
+# --------------------------
+def random_case(seed, modes=None):
+    """(mode, Field, NavConfig, NoiseModel or None, clean) for ``seed``."""
+    rng = random.Random(seed)
+    mode = rng.choice(sorted(modes or STRATEGIES))
+    clean = rng.random() < 0.5
+    if clean:
+        check_distance = rng.randint(3, 30)
+        # A step longer than the detection window could jump over a plant or tag
+        speed = rng.randint(1, check_distance)
+    else:
+        # Noise needs several reads per tag and steps well inside the read window;
+        # a lane-end tag that is never read sends the bot off the field
+        check_distance = rng.randint(12, 30)
+        speed = rng.randint(1, check_distance // 4)
+    config = NavConfig(speed=speed, check_distance=check_distance,
+                       check_duration=rng.randint(1, 5), paired_checks=rng.random() < 0.3,
+                       localize=not clean and rng.random() < 0.5,
+                       odometry_scale=1.0 if clean or rng.random() < 0.5 else rng.uniform(0.99, 1.01))
+
+    left_x = rng.randint(0, 100)
+    width = rng.randint(6 * check_distance, 400)
+    right_x = left_x + width
+    gap = rng.randint(check_distance + 1, 80)
+    top = rng.randint(20, 100)
+    rows = [top + i * gap for i in range(rng.randint(1, 7))]
+    plants = [sorted({(rng.randint(left_x, right_x), y) for _ in range(rng.randint(0, 6))}) for y in rows]
+    first_plant_x = min([p[0] for row in plants for p in row] or [left_x])
+    field = Field(row_positions=rows, plants=plants, first_plant_x=first_plant_x,
+                  left_x=left_x, right_x=right_x)
+    if clean:
+        return mode, field, config, None, True
+
+    noise = None
+    if rng.random() < 0.7:
+        def pick(value):
+            return value if rng.random() < 0.5 else 0
+        noise = NoiseModel(seed, detect_sigma=pick(rng.uniform(0, check_distance / 4)),
+                           detect_dropout=pick(rng.uniform(0, 0.3)), detect_latency=pick(rng.randint(1, 3)),
+                           rfid_sigma=pick(rng.uniform(0, check_distance / 6)),
+                           rfid_dropout=pick(rng.uniform(0, 0.2)), rfid_latency=pick(rng.randint(1, 3)),
+                           odometry_sigma=pick(rng.uniform(0, 0.01)), inspect_sigma=pick(rng.uniform(0, 0.3)))
+    field.tags = random_tags(rng, field, check_distance)
+    field.obstacles = random_obstacles(rng, field, config)
+    return mode, field, config, noise, not field.tags and noise is None and config.odometry_scale == 1.0
+
+def random_tags(rng, field, check_distance):
+    """
+    Up to one extra tag per lane, and actions on some lane-end tags. Extra
+    tags keep out of reading range of the lane-end tags until a pass over
+    those has ended: the reader reports one tag at a time.
+    """
+    tags = []
+    lo, hi = field.left_x + 3 * check_distance, field.right_x - 3 * check_distance
+    for group, lane in enumerate(field.lanes):
+        roll = rng.random()
+        if roll < 0.3:
+            actions = [rng.choice(["stop", "localize", "turn:left", "turn:right"])]
+            tags.append({"id": f"fuzz{group}", "x": rng.randint(lo, hi), "y": lane, "actions": actions})
+        elif roll < 0.45 and group > 0:
+            side = rng.choice(["left", "right"])
+            target = rng.randint(0, field.groups)  # Out-of-range and backward switches are rejected
+            tags.append({"id": f"lane{group}-{side}", "actions": [f"switch_group:{target}"]})
+    return tags
+
+def random_obstacles(rng, field, config):
+    """Posts past the lane-end tags, inside sensor range at times but never blocking."""
+    obstacles = []
+    # Farther than the bot can overshoot a tag (late reads, drift, checks at the tag) plus the stop distance
+    overshoot = 2 * config.check_distance + 6 * config.speed + (field.right_x - field.left_x) // 10
+    for _ in range(rng.randint(0, 3)):
+        radius = rng.randint(3, 10)
+        clearance = config.stop_distance + 8 + radius + overshoot + rng.randint(0, 30)
+        x = field.right_x + clearance if rng.random() < 0.5 else field.left_x - clearance
+        obstacles.append((x, rng.choice(field.lanes), radius))
+    return obstacles
+
+def tick_budget(field, config):
+    """Generous upper bound on the ticks a correct run needs."""
+    span = (field.right_x - field.left_x) + (field.lanes[-1] - field.lanes[0])
+    plants = sum(len(row) for row in field.plants)
+    return 4 * field.groups * span // config.speed + plants * (config.check_duration + 8) + 50 * field.groups + 100
+
+# --------------------------
+# Running a Case
+# --------------------------
+def run_case(seed, modes=None):
+    """Run one case; raises CaseFailure on a broken invariant, else returns the tick count."""
+    mode, field, config, noise, clean = random_case(seed, modes)
+    backend = MotorBackend(simulate=True, gpio=FakeGPIO(history=1))
+    engine = NavEngine(field, mode, config, backend, noise=noise)
+    checks = {}
+
+    def on_event(engine, level, event, fields):
+        if event == "plant_checked":
+            checks[fields["plant"]] = checks.get(fields["plant"], 0) + 1
+
+    engine.add_listener(on_event)
+    allowed = TRANSITIONS[mode]
+    check_state = engine.strategy.check_state
+    budget = tick_budget(field, config)
+    # The rows and lane-end tags, not the obstacles (posts well outside the lanes)
+    margin = (2 if clean else 6) * config.speed
+    ys = field.row_positions + field.lanes
+    x_min, x_max = field.left_x - margin, field.right_x + margin
+    y_min, y_max = min(ys) - margin, max(ys) + margin
+
+    def fail(message):
+        raise CaseFailure(seed, f"{mode}: {message} (tick {engine.tick}, pos {engine.pos})")
+
+    step = engine.step
+    while not engine.done:
+        if engine.tick >= budget:
+            fail(f"no termination within {budget} ticks in {engine.direction}")
+        state = engine.direction
+        step()
+        new_state = engine.direction
+        if new_state != state:
+            if new_state not in allowed.get(state, ()):
+                fail(f"illegal transition {state} -> {new_state}")
+            if state == check_state and new_state != engine.resume_state:
+                fail(f"check resumed {new_state}, interrupted {engine.resume_state}")
+        x, y = engine.true_pos
+        if not (x_min <= x <= x_max and y_min <= y <= y_max):
+            fail("left the field")
+
+    for row in field.plants:
+        for plant in row:
+            count = checks.get(plant, 0)
+            if count > 1 or (clean and count != 1):
+                fail(f"plant {plant} checked {count} times")
+    if len(engine.plants) != len(checks):
+        fail(f"{len(engine.plants)} plants marked checked, {len(checks)} inspected")
+    return engine.tick
+
+def _run_range(args):
+    start, count, modes = args
+    failures = []
+    for seed in range(start, start + count):
+        try:
+            run_case(seed, modes)
+        except CaseFailure as exc:
+            failures.append((seed, str(exc)))
+    return failures
+
+def fuzz(cases=1000, start=0, workers=1, modes=None, chunk=200):
+    """Run seeds ``start .. start + cases``; returns (failures, seconds)."""
+    began = time.perf_counter()
+    jobs = [(s, min(chunk, start + cases - s), modes) for s in range(start, start + cases, chunk)]
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(_run_range, jobs)
+    else:
+        results = map(_run_range, jobs)
+    failures = [f for part in results for f in part]
+    return failures, time.perf_counter() - began
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="farmbot_nav.fuzz", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--start", type=int, default=0, help="first seed")
+    parser.add_argument("--seed", type=int, default=None, help="replay a single seed")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--mode", action="append", choices=sorted(STRATEGIES),
+                        help="restrict to a mode (repeatable)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        mode, field, config, noise, clean = random_case(args.seed, args.mode)
+        if args.verbose:
+            print(f"mode={mode} clean={clean} config={config.as_dict()}")
+            print(f"noise={noise.as_dict() if noise is not None else None}")
+            print(f"field={field.to_dict()}")
+        print(f"seed {args.seed}: ok after {run_case(args.seed, args.mode)} ticks")
+        return 0
+
+    failures, seconds = fuzz(args.cases, args.start, args.workers, args.mode)
+    for seed, message in failures[:20]:
+        print(message)
+    print(f"{args.cases} cases in {seconds:.2f} s ({args.cases / seconds:.0f}/s, "
+          f"--workers {max(args.workers, 1)}), {len(failures)} failed")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,146 @@
+"""
+Motor GPIO backend with lazy initialization.
+
+Nothing touches the GPIO header until the first motor command, so nav
+modules can be imported by tests and tooling off the robot. When RPi.GPIO
+is not installed (desktop, CI) a FakeGPIO with the same API records the
+writes instead.
+"""
+import threading
+import time
+
+MOTOR_PINS = (7, 11, 13, 15)  # Left fwd/back, right fwd/back (BOARD numbering)
+
+class FakeGPIO:
+    """Stand-in for RPi.GPIO that records pin levels and write history."""
+    BOARD = "BOARD"
+    BCM = "BCM"
+    OUT = "OUT"
+    IN = "IN"
+
+    def __init__(self, history=1024):
+        self.mode = None
+        self.pins = {}
+        self.writes = 0
+        self.history = []
+        self.max_history = history
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, pin, direction):
+        self.pins[pin] = False
+
+    def output(self, pin, value):
+        if pin not in self.pins:
+            raise RuntimeError(f"GPIO pin {pin} was not set up as an output")
+        self.pins[pin] = bool(value)
+        self.writes += 1
+        if len(self.history) >= self.max_history:
+            del self.history[: self.max_history // 2]
+        self.history.append((time.perf_counter(), pin, bool(value)))
+
+    def cleanup(self):
+        self.pins.clear()
+
+def load_gpio(simulate=None):
+    """
+    Return (gpio_module, name). ``simulate=None`` uses RPi.GPIO when it can
+    be imported and falls back to FakeGPIO otherwise.
+    """
+    if not simulate:
+        try:
+            import RPi.GPIO as GPIO
+            return GPIO, "RPi.GPIO"
+        except (ImportError, RuntimeError):
+            if simulate is False:
+                raise
+    return FakeGPIO(), "FakeGPIO"
+
+class MotorBackend:
+    """
+    The four motor driver pins, set up on first use.
+
+    ``set(p7, p11, p13, p15)`` writes one level per pin in MOTOR_PINS order.
+    The loop, manual driver, watchdog and motor scheduler all write from
+    their own threads, so each 4-pin write holds a lock and is never torn.
+    ``stop(latch=True)`` (the watchdog) also blocks every later ``set()``
+    until ``release()``, so a late command cannot re-energize the motors.
+    ``on_write`` (e.g. a metrics counter's ``inc``) is called with the number
+    of pin writes; ``on_first_command`` fires once, for cold-start timing.
+    """
+
+    def __init__(self, pins=MOTOR_PINS, simulate=None, gpio=None,
+                 on_write=None, on_first_command=None):
+        self.pins = tuple(pins)
+        self.simulate = simulate
+        self.on_write = on_write
+        self.on_first_command = on_first_command
+        self.gpio = gpio
+        self.name = type(gpio).__name__ if gpio is not None else None
+        self.initialized = False
+        self.levels = (False,) * len(self.pins)
+        self.latched = False
+        self._lock = threading.RLock()
+
+    def init(self):
+        """Import and configure GPIO now (normally done by the first command)."""
+        with self._lock:
+            if self.initialized:
+                return self
+            if self.gpio is None:
+                self.gpio, self.name = load_gpio(self.simulate)
+            self.gpio.setmode(self.gpio.BOARD)
+            for pin in self.pins:
+                self.gpio.setup(pin, self.gpio.OUT)
+            self.initialized = True
+        return self
+
+    def set(self, *levels):
+        """Write the pins; returns False (nothing written) while a stop is latched."""
+        with self._lock:
+            if self.latched:
+                return False
+            self._write(levels)
+        self._first_command()
+        return True
+
+    def stop(self, latch=False):
+        """All pins low; with ``latch`` they stay low until ``release()``."""
+        with self._lock:
+            self._write((False,) * len(self.pins))
+            if latch:
+                self.latched = True
+        self._first_command()
+
+    def release(self):
+        with self._lock:
+            self.latched = False
+
+    def _write(self, levels):
+        if not self.initialized:
+            self.init()
+        output = self.gpio.output
+        for pin, level in zip(self.pins, levels):
+            output(pin, level)
+        self.levels = tuple(levels)
+        if self.on_write is not None:
+            self.on_write(len(levels))
+
+    def _first_command(self):
+        if self.on_first_command is None:
+            return
+        with self._lock:
+            callback, self.on_first_command = self.on_first_command, None
+        # Outside the lock: the callback logs, and must not hold up other writers
+        if callback is not None:
+            callback()
+
+    def cleanup(self):
+        """Release the pins; a no-op if GPIO was never initialized."""
+        if self.initialized:
+            self.gpio.cleanup()
+            self.initialized = False
@@ -0,0 +1,203 @@
+"""
+Plant inspection pipeline.
+
+CHECK_PLANT only captures a job; the slow image/sensor analysis runs in a
+process pool of analyzer plugins and results come back asynchronously.
+The navigation loop only ever waits here when the backpressure limit
+(``max_pending`` in-flight plants) is hit.
+"""
+import collections
+import concurrent.futures
+import logging
+import queue
+import signal
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# --------------------------
+# Jobs and Results
+# --------------------------
+InspectionJob = collections.namedtuple(
+    "InspectionJob", ["plant", "tick", "timestamp", "payload"]
+)
+InspectionResult = collections.namedtuple(
+    "InspectionResult", ["plant", "analyzer", "ok", "data", "error", "duration"]
+)
+
+# --------------------------
+# Analyzer Plugins
+# --------------------------
+ANALYZERS = {}
+
+def register_analyzer(name):
+    """Class decorator that makes an analyzer available by name."""
+    def decorator(cls):
+        cls.name = name
+        ANALYZERS[name] = cls
+        return cls
+    return decorator
+
+def load_analyzer(name, **kwargs):
+    """Create a registered analyzer plugin by name."""
+    try:
+        return ANALYZERS[name](**kwargs)
+    except KeyError:
+        raise ValueError(f"Unknown analyzer: {name!r}") from None
+
+class Analyzer:
+    """
+    Base class for analyzer plugins.
+    Instances are pickled once into each worker process, so keep them light.
+    """
+    name = "base"
+
+    def analyze(self, job):
+        """Return a dict describing the plant in ``job``."""
+        raise NotImplementedError
+
+@register_analyzer("stub")
+class StubAnalyzer(Analyzer):
+    """Deterministic analyzer for tests and off-robot simulation runs."""
+
+    def __init__(self, delay=0.0, score=1.0):
+        self.delay = delay
+        self.score = score
+
+    def analyze(self, job):
+        if self.delay:
+            time.sleep(self.delay)
+        return {"healthy": self.score >= 0.5, "score": self.score}
+
+# --------------------------
+# Worker Process Side
+# --------------------------
+_worker_analyzers = ()
+
+def _init_worker(analyzers):
+    global _worker_analyzers
+    # Ctrl-C is handled by the navigation process, which shuts the pool down.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_analyzers = tuple(analyzers)
+
+def _inspect(job, analyzers=None):
+    """Run every analyzer on ``job``; one failing plugin doesn't hide the others."""
+    results = []
+    for analyzer in (analyzers if analyzers is not None else _worker_analyzers):
+        start = time.perf_counter()
+        try:
+            data = analyzer.analyze(job)
+            error = None
+        except Exception as exc:
+            data = None
+            error = f"{type(exc).__name__}: {exc}"
+        results.append(InspectionResult(
+            job.plant, analyzer.name, error is None, data, error,
+            time.perf_counter() - start,
+        ))
+    return results
+
+# --------------------------
+# Inspection Pool
+# --------------------------
+class InspectionPool:
+    """
+    Bounded set of in-flight inspection jobs keyed by plant coordinate.
+
+    ``submit()`` returns immediately unless ``max_pending`` plants are
+    already being analysed. Finished results are collected with ``drain()``
+    from the control loop, or pushed to ``on_result`` from the pool's
+    callback thread. An ``on_result`` that raises is logged and counted in
+    ``callback_errors``; the result is still drained.
+    """
+
+    def __init__(self, analyzers, workers=2, max_pending=8, on_result=None,
+                 executor=None):
+        self.analyzers = list(analyzers)
+        self.max_pending = max_pending
+        self.on_result = on_result
+        self.backpressure_waits = 0
+        self.callback_errors = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._results = queue.SimpleQueue()
+        self._inline = executor is not None
+        if executor is None:
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self.analyzers,),
+            )
+        self._executor = executor
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+    def __contains__(self, plant):
+        with self._lock:
+            return plant in self._pending
+
+    def submit(self, plant, tick=0, payload=None):
+        """
+        Queue ``plant`` for inspection. Returns False if that plant is
+        already in flight. Blocks only while the backpressure limit is hit.
+        """
+        with self._lock:
+            if plant in self._pending:
+                return False
+            in_flight = list(self._pending.values())
+        while sum(not f.done() for f in in_flight) >= self.max_pending:
+            self.backpressure_waits += 1
+            concurrent.futures.wait(
+                in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            with self._lock:
+                in_flight = list(self._pending.values())
+
+        job = InspectionJob(plant, tick, time.time(), payload)
+        if self._inline:
+            # Injected executors (threads, tests) don't run _init_worker.
+            future = self._executor.submit(_inspect, job, self.analyzers)
+        else:
+            future = self._executor.submit(_inspect, job)
+        with self._lock:
+            self._pending[plant] = future
+        future.add_done_callback(lambda f, plant=plant: self._on_done(plant, f))
+        return True
+
+    def _on_done(self, plant, future):
+        try:
+            results = future.result()
+        except Exception as exc:
+            results = [InspectionResult(
+                plant, None, False, None, f"{type(exc).__name__}: {exc}", 0.0
+            )]
+        # Free the slot first: a raising on_result must not leave the plant
+        # pending forever (blocking resubmits and backpressure)
+        with self._lock:
+            self._pending.pop(plant, None)
+        for result in results:
+            self._results.put(result)
+            if self.on_result is None:
+                continue
+            try:
+                self.on_result(result)
+            except Exception:
+                with self._lock:
+                    self.callback_errors += 1
+                logger.exception("on_result failed for plant %s (%s)", plant, result.analyzer)
+
+    def drain(self):
+        """Return all results that have arrived, without blocking."""
+        drained = []
+        while True:
+            try:
+                drained.append(self._results.get_nowait())
+            except queue.Empty:
+                return drained
+
+    def close(self, wait=True):
+        """Shut down the worker pool. With ``wait`` pending jobs finish first."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
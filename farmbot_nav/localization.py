@@ -0,0 +1,75 @@
+"""
+Pose correction at RFID tags.
+
+The pose is dead reckoned from the commanded moves, so wheel slip builds
+up over a long row. PoseFilter keeps a variance per axis, grown with the
+distance driven. At each tag read it does a Kalman update toward the
+position the read implies.
+
+That position comes from the tag's surveyed coordinate. The reader fires
+as the tag comes into range, so along the direction of travel the bot is
+about ``read_range`` short of the tag, give or take one step (variance of
+a step-wide uniform error plus ``tag_variance``). Across it the read only
+says the tag is somewhere in range, so that axis gets the variance of a
+range-wide uniform error and pulls the estimate much less. Passing beside
+the tag (turning down at a lane end, say) the range is reached closer
+along, at ``sqrt(read_range**2 - across**2)`` for the estimated offset
+across.
+
+A read that breaks those assumptions (the reader firing late at the edge
+of its range, as the bot passes beside a tag) would drag the pose a long
+way, so an axis whose innovation is beyond ``gate`` standard deviations of
+what the filter expects is left uncorrected.
+"""
+import math
+
+class PoseFilter:
+    """Independent 1D Kalman filters on x and y (diagonal 2D covariance)."""
+
+    def __init__(self, drift_variance=0.1, tag_variance=4.0, variance=0.0, gate=3.0):
+        self.drift_variance = drift_variance  # Added per pixel driven
+        self.tag_variance = tag_variance      # Of a tag read across the direction of travel
+        self.gate = gate                      # Standard deviations before an innovation is an outlier
+        self.variance = [variance, variance]
+        self.reads = 0
+        self.rejected = 0  # Axis updates skipped as outliers
+        self.sum_squares = 0.0
+        self.max_residual = 0.0
+
+    def predict(self, dx, dy):
+        grown = self.drift_variance * (abs(dx) + abs(dy))
+        self.variance[0] += grown
+        self.variance[1] += grown
+
+    def measurement(self, tag, direction, read_range, step, pos=None):
+        """(position, variances) a read of the tag at (x, y) implies, moving along ``direction`` from ``pos``."""
+        ux, uy = direction
+        across = 0.0 if pos is None else (pos[1] - tag[1] if ux else pos[0] - tag[0])
+        offset = math.sqrt(max(read_range * read_range - across * across, 0.0)) - step / 2.0
+        along = self.tag_variance + step * step / 12.0
+        across = self.tag_variance + (2.0 * read_range) ** 2 / 12.0
+        return ((tag[0] - ux * offset, tag[1] - uy * offset),
+                (along if ux else across, along if uy else across))
+
+    def update(self, pos, measured, variances):
+        """Correct ``pos`` (list, in place) toward ``measured``; returns the residual (dx, dy)."""
+        residual = []
+        for axis in (0, 1):
+            innovation = measured[axis] - pos[axis]
+            spread = self.variance[axis] + variances[axis]
+            residual.append(innovation)
+            if innovation * innovation > self.gate * self.gate * spread:
+                self.rejected += 1
+                continue
+            gain = self.variance[axis] / spread
+            pos[axis] += gain * innovation
+            self.variance[axis] *= 1.0 - gain
+        error = math.hypot(*residual)
+        self.reads += 1
+        self.sum_squares += error * error
+        self.max_residual = max(self.max_residual, error)
+        return tuple(residual)
+
+    @property
+    def rms_residual(self):
+        return math.sqrt(self.sum_squares / self.reads) if self.reads else 0.0
@@ -0,0 +1,231 @@
+"""
+Low-latency manual override.
+
+Key presses are posted to a ManualDriver, whose own thread applies them to
+the motors immediately instead of waiting for the next frame. The driver
+measures input-to-GPIO latency and stops the motors if input goes stale
+(deadman timeout), e.g. when a key-up or network packet is lost.
+
+Keys reach the driver from a reader thread of their own, never from the
+control loop: PygameKeyReader blocks in ``pygame.event.wait()`` on the
+window, TerminalKeyReader in ``select()`` on a raw terminal. Each stamps a
+key the moment its wait returns, so the latency covers the whole path from
+the key event to the pin write.
+"""
+import collections
+import os
+import queue
+import select
+import sys
+import threading
+import time
+
+_RELEASE = "release"
+_SHUTDOWN = "shutdown"
+
+class ManualDriver:
+    """
+    Applies manual drive commands on a dedicated thread.
+
+    ``commands`` maps a command name (e.g. "right") to the motor function
+    that drives it; ``stop`` is the motor stop function. Any thread may call
+    ``press``/``release``; only the driver thread touches GPIO. Pressing the
+    active command again (key repeat) keeps it alive.
+    """
+
+    def __init__(self, commands, stop, deadman=0.3, history=512):
+        self.commands = dict(commands)
+        self.stop_motors = stop
+        self.deadman = deadman
+        self.active = None  # Command currently driving the motors
+        self.deadman_trips = 0
+        self.latencies = collections.deque(maxlen=history)  # seconds, input -> GPIO
+        self._queue = queue.SimpleQueue()
+        self._last_input = 0.0
+        self._thread = threading.Thread(target=self._run, name="manual-driver", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    # --------------------------
+    # Input side (any thread)
+    # --------------------------
+    def press(self, command, timestamp=None):
+        """Drive ``command`` until release, or until the deadman expires."""
+        if command not in self.commands:
+            raise ValueError(f"Unknown manual command: {command!r}")
+        self._queue.put((command, timestamp or time.perf_counter()))
+
+    def release(self, timestamp=None):
+        self._queue.put((_RELEASE, timestamp or time.perf_counter()))
+
+    # --------------------------
+    # Driver thread
+    # --------------------------
+    def _run(self):
+        while True:
+            timeout = None
+            if self.active is not None:
+                timeout = max(0.0, self._last_input + self.deadman - time.perf_counter())
+            try:
+                command, stamp = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                # Deadman: no fresh input while driving
+                self.stop_motors()
+                self.active = None
+                self.deadman_trips += 1
+                continue
+            if command == _SHUTDOWN:
+                self.stop_motors()
+                self.active = None
+                return
+            self._last_input = time.perf_counter()
+            if command == _RELEASE:
+                self.stop_motors()
+                self.active = None
+            elif command != self.active:
+                self.commands[command]()
+                self.active = command
+            else:
+                continue
+            self.latencies.append(time.perf_counter() - stamp)
+
+    def stop(self):
+        """Stop the motors and the driver thread."""
+        self._queue.put((_SHUTDOWN, time.perf_counter()))
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def latency_report(self):
+        """One-line summary of input-to-GPIO latency."""
+        if not self.latencies:
+            return "manual input: no commands applied"
+        samples = sorted(self.latencies)
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        return (f"manual input: {len(samples)} cmds, "
+                f"mean {1e3 * sum(samples) / len(samples):.2f} ms, "
+                f"p99 {1e3 * p99:.2f} ms, max {1e3 * samples[-1]:.2f} ms, "
+                f"deadman stops {self.deadman_trips}")
+
+# --------------------------
+# Key Sources
+# --------------------------
+ARROWS = ("right", "left", "up", "down")
+
+class KeyReader:
+    """
+    Feeds a ManualDriver from its own thread. Arrow keys drive only while the
+    override is ``enabled``; the toggle key only raises ``toggle_requested``,
+    and the control loop flips the override between ticks (so the engine
+    never writes the pins after a manual command). The quit key counts only
+    during the override, as in the scripts.
+    """
+
+    def __init__(self, driver, name, toggle_key="m", quit_key="q"):
+        self.driver = driver
+        self.toggle_key = toggle_key
+        self.quit_key = quit_key
+        self.enabled = False
+        self.toggle_requested = threading.Event()
+        self.quit_requested = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+
+    def take_toggle(self):
+        """True once for each toggle key press since the last call."""
+        if not self.toggle_requested.is_set():
+            return False
+        self.toggle_requested.clear()
+        return True
+
+    def key(self, name, stamp):
+        """Handle a key: an arrow name, ``release``, or the toggle/quit key."""
+        if name == self.toggle_key:
+            self.toggle_requested.set()
+        elif not self.enabled:
+            return
+        elif name == self.quit_key:
+            self.quit_requested.set()
+        elif name == _RELEASE:
+            self.driver.release(stamp)
+        elif name in ARROWS:
+            self.driver.press(name, stamp)
+
+    def _run(self):
+        raise NotImplementedError
+
+class PygameKeyReader(KeyReader):
+    """
+    Arrow keys from the pygame window, the Motor_control.py way: the thread
+    blocks in ``pygame.event.wait()``, so a key is applied as soon as SDL
+    queues it rather than on the next control tick. This thread then owns
+    the event queue: the control loop must not call ``pygame.event.get()``,
+    and a window close raises ``quit_requested``. Held keys repeat every
+    50 ms (``pygame.key.set_repeat``) to keep the deadman fed.
+    """
+
+    def __init__(self, driver, pygame, toggle_key="m", quit_key="q"):
+        super().__init__(driver, "pygame-keys", toggle_key, quit_key)
+        self.pygame = pygame
+        self.keys = {pygame.K_RIGHT: "right", pygame.K_LEFT: "left", pygame.K_UP: "up",
+                     pygame.K_DOWN: "down", ord(toggle_key): toggle_key, ord(quit_key): quit_key}
+        pygame.key.set_repeat(100, 50)
+
+    def _run(self):
+        pygame = self.pygame
+        while not self._stopping.is_set():
+            event = pygame.event.wait(100)  # ms, so stop() is noticed
+            stamp = time.perf_counter()
+            if event.type == pygame.QUIT:
+                self.quit_requested.set()
+            elif event.type == pygame.KEYDOWN and event.key in self.keys:
+                self.key(self.keys[event.key], stamp)
+            elif event.type == pygame.KEYUP and self.keys.get(event.key) in ARROWS:
+                self.key(_RELEASE, stamp)
+
+ARROW_KEYS = {"\x1b[A": "up", "\x1b[B": "down", "\x1b[C": "right", "\x1b[D": "left"}
+
+class TerminalKeyReader(KeyReader):
+    """
+    Reads arrow keys from a raw terminal (SSH session) on its own thread,
+    independent of any pygame frame loop. Terminals have no key-up, so the
+    key auto-repeat keeps the command alive and the deadman stops it; space
+    stops at once.
+    """
+
+    def __init__(self, driver, keys=ARROW_KEYS, toggle_key="m", quit_key="q", stream=None):
+        super().__init__(driver, "terminal-keys", toggle_key, quit_key)
+        self.keys = keys
+        self.stream = stream or sys.stdin
+
+    def _run(self):
+        import termios
+        import tty
+        fd = self.stream.fileno()
+        saved = termios.tcgetattr(fd)
+        try:
+            tty.setcbreak(fd)
+            while not self._stopping.is_set():
+                ready, _, _ = select.select([fd], [], [], 0.1)
+                if not ready:
+                    continue
+                stamp = time.perf_counter()
+                data = os.read(fd, 3).decode(errors="ignore")
+                if data in self.keys:
+                    self.key(self.keys[data], stamp)
+                elif data == " ":
+                    self.key(_RELEASE, stamp)
+                else:
+                    self.key(data, stamp)
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, saved)
@@ -0,0 +1,203 @@
+"""
+Occupancy-grid map of the field, built from the bot's own traversal.
+
+The fine grid is a NumPy uint8 array (UNKNOWN / FREE / OCCUPIED per cell).
+Each tick only the cells between the previous and the current position are
+touched, plus the cells a range-sensor reading covers; nothing is ever
+rebuilt. A coarse level keeps the number of occupied fine cells per block,
+updated on every state change, so "is anything blocked around here?" is
+one array read.
+
+Grids persist as .npz files (written atomically), so the next run starts
+with the headlands already known to be blocked. A grid made for a field
+stores a digest of that field's definition with it, and ``load_or_create`` ignores a
+saved grid built for a different field.
+"""
+import hashlib
+import json
+import math
+import os
+import tempfile
+
+import numpy as np
+
+UNKNOWN, FREE, OCCUPIED = 0, 1, 2
+
+class OccupancyGrid:
+    """Fine grid of ``resolution``-pixel cells plus a coarse per-block occupied count."""
+
+    def __init__(self, width, height, resolution=5, origin=(0, 0), coarse_factor=8):
+        self.resolution = resolution
+        self.origin = (float(origin[0]), float(origin[1]))
+        self.coarse_factor = coarse_factor
+        self.cells = np.zeros((math.ceil(height / resolution), math.ceil(width / resolution)), np.uint8)
+        rows, cols = self.cells.shape
+        self.coarse = np.zeros((math.ceil(rows / coarse_factor), math.ceil(cols / coarse_factor)), np.int32)
+        self.updates = 0
+        self.field = None  # field_key of the Field this grid maps, if built for one
+
+    @classmethod
+    def for_field(cls, field, margin=50, resolution=5, coarse_factor=8):
+        x0, y0, x1, y1 = field.bounds(margin)
+        grid = cls(x1 - x0, y1 - y0, resolution, (x0, y0), coarse_factor)
+        grid.field = field_key(field)
+        return grid
+
+    @property
+    def shape(self):
+        return self.cells.shape
+
+    # --------------------------
+    # Coordinates
+    # --------------------------
+    def cell_of(self, x, y):
+        """(row, col) of the fine cell containing (x, y); may be out of bounds."""
+        return (int((y - self.origin[1]) // self.resolution),
+                int((x - self.origin[0]) // self.resolution))
+
+    def center_of(self, row, col):
+        r = self.resolution
+        return (self.origin[0] + (col + 0.5) * r, self.origin[1] + (row + 0.5) * r)
+
+    def in_bounds(self, row, col):
+        rows, cols = self.cells.shape
+        return 0 <= row < rows and 0 <= col < cols
+
+    # --------------------------
+    # Incremental Updates
+    # --------------------------
+    def set_cell(self, row, col, state):
+        """Set one fine cell, keeping the coarse counts in step. Returns True if it changed."""
+        if not self.in_bounds(row, col):
+            return False
+        old = self.cells[row, col]
+        if old == state:
+            return False
+        self.cells[row, col] = state
+        if old == OCCUPIED or state == OCCUPIED:
+            self.coarse[row // self.coarse_factor, col // self.coarse_factor] += 1 if state == OCCUPIED else -1
+        self.updates += 1
+        return True
+
+    def trace(self, start, end, state=FREE):
+        """Set every cell on the segment start -> end (walked cell by cell)."""
+        r0, c0 = self.cell_of(*start)
+        r1, c1 = self.cell_of(*end)
+        steps = max(abs(r1 - r0), abs(c1 - c0))
+        if steps == 0:
+            return self.set_cell(r0, c0, state)
+        changed = False
+        for i in range(steps + 1):
+            changed |= self.set_cell(r0 + round((r1 - r0) * i / steps),
+                                     c0 + round((c1 - c0) * i / steps), state)
+        return changed
+
+    def mark_disk(self, x, y, radius, state=OCCUPIED):
+        """Set the cells whose centers lie within ``radius`` of (x, y)."""
+        r0, c0 = self.cell_of(x - radius, y - radius)
+        r1, c1 = self.cell_of(x + radius, y + radius)
+        for row in range(r0, r1 + 1):
+            for col in range(c0, c1 + 1):
+                cx, cy = self.center_of(row, col)
+                if (cx - x) ** 2 + (cy - y) ** 2 <= radius * radius:
+                    self.set_cell(row, col, state)
+
+    # --------------------------
+    # Lookups
+    # --------------------------
+    def state_at(self, x, y):
+        row, col = self.cell_of(x, y)
+        return int(self.cells[row, col]) if self.in_bounds(row, col) else UNKNOWN
+
+    def is_blocked(self, x, y):
+        return self.state_at(x, y) == OCCUPIED
+
+    def coarse_blocked(self, x, y):
+        """True if any fine cell in the coarse block around (x, y) is occupied (one read)."""
+        row, col = self.cell_of(x, y)
+        if not self.in_bounds(row, col):
+            return False
+        return bool(self.coarse[row // self.coarse_factor, col // self.coarse_factor])
+
+    def blocked_cells(self):
+        """(row, col) array of every occupied cell."""
+        return np.argwhere(self.cells == OCCUPIED)
+
+    # --------------------------
+    # Persistence
+    # --------------------------
+    def save(self, path):
+        """Write the grid to ``path`` (.npz) via a temp file and os.replace."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".map-", suffix=".npz", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, cells=self.cells, origin=np.array(self.origin),
+                                    resolution=self.resolution, coarse_factor=self.coarse_factor,
+                                    field=np.array(self.field or ""))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            cells = data["cells"]
+            resolution = int(data["resolution"])
+            grid = cls(cells.shape[1] * resolution, cells.shape[0] * resolution, resolution,
+                       tuple(data["origin"]), int(data["coarse_factor"]))
+            field = str(data["field"]) if "field" in data.files else ""
+        grid.field = field or None
+        grid.cells[:] = cells
+        # Rebuild the coarse counts from the fine cells
+        occupied = grid.blocked_cells()
+        np.add.at(grid.coarse, (occupied[:, 0] // grid.coarse_factor,
+                                occupied[:, 1] // grid.coarse_factor), 1)
+        return grid
+
+    @classmethod
+    def load_or_create(cls, path, field, **kwargs):
+        """The saved grid at ``path`` if it was built for ``field``, else an empty grid for ``field``."""
+        try:
+            grid = cls.load(path)
+        except (OSError, ValueError, KeyError):
+            return cls.for_field(field, **kwargs)
+        if grid.field != field_key(field):
+            return cls.for_field(field, **kwargs)  # Another field's map (or one from before fields were stored)
+        return grid
+
+def field_key(field):
+    """Digest of a Field's definition, used to match a saved grid to its field."""
+    data = json.dumps(field.to_dict(), sort_keys=True, default=list)
+    return hashlib.sha1(data.encode()).hexdigest()
+
+class Mapper:
+    """
+    Feeds an OccupancyGrid from a running NavEngine: the path driven each
+    tick becomes FREE, and obstacles the range sensor reports are marked
+    OCCUPIED.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self._last = None
+
+    def attach(self, engine):
+        engine.add_tick_listener(self.on_tick)
+        engine.add_listener(self.on_event)
+        return self
+
+    def on_tick(self, engine):
+        pos = (engine.pos[0], engine.pos[1])
+        if pos != self._last:
+            self.grid.trace(self._last or pos, pos)
+            self._last = pos
+
+    def on_event(self, engine, level, event, fields):
+        if event == "obstacle_detected":
+            obstacle = fields.get("obstacle")
+            if obstacle is not None:
+                self.grid.mark_disk(obstacle[0], obstacle[1], obstacle[2])
@@ -0,0 +1,188 @@
+"""
+Deadline-scheduled motor commands.
+
+A turn used to be ``command; time.sleep(seconds); stop``, so its length
+picked up the OS scheduling jitter of the sleep on both ends.
+MotorScheduler keeps a heap of (deadline, pin levels) actions, ordered by
+monotonic deadline, and runs them on its own thread. The thread sleeps
+until ``spin`` seconds before a deadline, then busy-waits the rest, so the
+pins change within microseconds of the deadline. It asks for real-time
+priority (SCHED_FIFO) where the OS allows it.
+
+Every action records its timing error (write time minus deadline), and a
+timed command also records its achieved duration, so turn accuracy and
+repeatability can be measured::
+
+    scheduler = MotorScheduler(backend).start()
+    scheduler.timed(levels, 1.0, "spin_left").wait()
+    print(scheduler.report())
+
+``sleep_until`` is the same sleep-then-spin wait, for pacing the control
+loop to fixed tick deadlines instead of a fixed delay per tick.
+"""
+import collections
+import heapq
+import itertools
+import os
+import threading
+import time
+
+def sleep_until(deadline, clock=time.perf_counter, spin=0.002):
+    """Wait until ``clock() >= deadline``: sleep most of the way, busy-wait the last ``spin`` s."""
+    remaining = deadline - clock()
+    if remaining > spin:
+        time.sleep(remaining - spin)
+    while clock() < deadline:
+        pass
+    return clock()
+
+class TimedCommand:
+    """Handle for ``MotorScheduler.timed``: ``wait()`` returns once the stop has been written."""
+
+    def __init__(self, label, seconds):
+        self.label = label
+        self.seconds = seconds
+        self.started = None  # Actual write times
+        self.stopped = None
+        self._done = threading.Event()
+
+    @property
+    def duration_error(self):
+        """Achieved minus requested duration (seconds), once done."""
+        if self.stopped is None:
+            return None
+        return self.stopped - self.started - self.seconds
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+class MotorScheduler:
+    """
+    Runs ``(deadline, levels)`` actions on ``backend`` (hardware.MotorBackend)
+    from a dedicated thread. ``on_done(command)`` is called for each finished
+    TimedCommand.
+    """
+
+    def __init__(self, backend, spin=0.002, clock=time.perf_counter, history=512,
+                 priority=10, on_done=None):
+        self.backend = backend
+        self.spin = spin
+        self.clock = clock
+        self.priority = priority
+        self.on_done = on_done
+        self.realtime = False
+        self.errors = collections.defaultdict(lambda: collections.deque(maxlen=history))
+        self.durations = collections.defaultdict(lambda: collections.deque(maxlen=history))
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="motor-scheduler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop the thread. Pending actions are not run on their deadlines, but
+        if any were queued the pins are set low now: a queued stop still
+        happens, so the motors never stay in the last commanded motion.
+        Unfinished TimedCommands are marked done (``stopped`` stays None).
+        """
+        with self._cond:
+            self._stopping = True
+            pending, self._heap = self._heap, []
+            self._cond.notify()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        if pending:
+            self.backend.stop()
+            for _, _, _, _, command in pending:
+                if command is not None:
+                    command._done.set()
+
+    # --------------------------
+    # Scheduling (any thread)
+    # --------------------------
+    def at(self, deadline, levels, label, command=None):
+        """Write ``levels`` to the motor pins at ``deadline`` (scheduler clock)."""
+        with self._cond:
+            heapq.heappush(self._heap, (deadline, next(self._seq), tuple(levels), label, command))
+            self._cond.notify()
+
+    def timed(self, levels, seconds, label):
+        """Drive ``levels`` from now for exactly ``seconds``, then stop; returns a TimedCommand."""
+        command = TimedCommand(label, seconds)
+        start = self.clock()
+        stop = (False,) * len(self.backend.pins)
+        with self._cond:
+            # Both actions go in together so nothing can be scheduled between them
+            heapq.heappush(self._heap, (start, next(self._seq), tuple(levels), label, command))
+            heapq.heappush(self._heap, (start + seconds, next(self._seq), stop, label, command))
+            self._cond.notify()
+        return command
+
+    def pending(self):
+        with self._cond:
+            return len(self._heap)
+
+    # --------------------------
+    # Scheduler Thread
+    # --------------------------
+    def _set_priority(self):
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.priority))
+            self.realtime = True
+        except (AttributeError, OSError):
+            pass  # Not Linux, or no CAP_SYS_NICE: normal priority with busy-wait refinement
+
+    def _run(self):
+        self._set_priority()
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    if self._heap:
+                        wait = self._heap[0][0] - self.clock() - self.spin
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                if self._stopping:
+                    return
+                deadline, _, levels, label, command = heapq.heappop(self._heap)
+            written = self._write(deadline, levels)
+            self.errors[label].append(written - deadline)
+            if command is not None:
+                if command.started is None:
+                    command.started = written
+                else:
+                    command.stopped = written
+                    self.durations[label].append(command.duration_error)
+                    command._done.set()
+                    if self.on_done is not None:
+                        self.on_done(command)
+
+    def _write(self, deadline, levels):
+        while self.clock() < deadline:
+            pass
+        written = self.clock()
+        self.backend.set(*levels)
+        return written
+
+    def report(self):
+        """Timing error per label: mean and max of |write - deadline| and of the duration error."""
+        lines = [f"motor scheduler ({'SCHED_FIFO' if self.realtime else 'normal priority'}):"]
+        for label in sorted(self.errors):
+            errors = [abs(e) * 1e6 for e in self.errors[label]]
+            line = (f"  {label:<10} {len(errors):4} writes, error mean {sum(errors) / len(errors):7.1f} us "
+                    f"max {max(errors):7.1f} us")
+            durations = [abs(d) * 1e6 for d in self.durations.get(label, ())]
+            if durations:
+                line += (f"; duration error mean {sum(durations) / len(durations):7.1f} us "
+                         f"max {max(durations):7.1f} us")
+            lines.append(line)
+        if not self.errors:
+            lines.append("  no timed commands")
+        return "\n".join(lines)
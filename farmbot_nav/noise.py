@@ -0,0 +1,118 @@
+"""
+Seeded noise and latency models for the headless engine.
+
+The original scripts detect plants and tags perfectly and instantly
+(``abs(bot_pos[0] - plant[0]) < check_distance``). A NoiseModel passed to
+NavEngine (``noise=``) makes benchmarks closer to field conditions:
+
+* plant detection: Gaussian error on the perceived distance
+  (``detect_sigma``), a per-tick dropout probability and a latency in
+  ticks (the bot keeps moving until the detection arrives),
+* RFID reads: the same three for every tag read (NavEngine._read_tags),
+* wheel odometry: per-tick Gaussian slip on the distance actually driven
+  (``odometry_sigma``, on top of NavConfig.odometry_scale),
+* inspection: Gaussian spread of the dwell around ``check_duration``
+  (``inspect_sigma`` as a fraction).
+
+Every model draws from its own child generator of one seed, so a run is
+reproduced by its seed, and turning one model on does not change another
+model's draws. Draws come from NumPy in blocks. ``draw(name, n)`` returns
+a whole array, so batch runs and analyses can sample vectorized.
+"""
+import numpy as np
+
+STREAMS = ("odometry", "detect", "detect_dropout", "rfid", "rfid_dropout", "inspect")
+
+class _Stream:
+    """Samples of one distribution, drawn ``block`` at a time."""
+
+    def __init__(self, sample, block=1024):
+        self.sample = sample
+        self.block = block
+        self._buffer = []
+        self._i = 0
+
+    def next(self):
+        if self._i == len(self._buffer):
+            self._buffer = self.sample(self.block).tolist()
+            self._i = 0
+        value = self._buffer[self._i]
+        self._i += 1
+        return value
+
+class NoiseModel:
+    """Detection, RFID, odometry and inspection noise for one seeded run."""
+
+    def __init__(self, seed=0, detect_sigma=0.0, detect_dropout=0.0, detect_latency=0,
+                 rfid_sigma=0.0, rfid_dropout=0.0, rfid_latency=0,
+                 odometry_sigma=0.0, inspect_sigma=0.0):
+        self.seed = seed
+        self.detect_sigma = detect_sigma      # Pixels of error on the perceived plant distance
+        self.detect_dropout = detect_dropout  # Probability a tick's detection is lost
+        self.detect_latency = detect_latency  # Ticks from detection to the stop command
+        self.rfid_sigma = rfid_sigma
+        self.rfid_dropout = rfid_dropout
+        self.rfid_latency = rfid_latency      # Ticks from a tag read to its actions
+        self.odometry_sigma = odometry_sigma  # Relative slip per tick
+        self.inspect_sigma = inspect_sigma    # Relative spread of the inspection dwell
+        generators = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(len(STREAMS))]
+        self.generators = dict(zip(STREAMS, generators))
+        self._streams = {name: _Stream(lambda n, name=name: self.draw(name, n)) for name in STREAMS}
+        self._pending_plants = {}  # plant index -> tick its detection arrives
+
+    def as_dict(self):
+        return {k: v for k, v in vars(self).items() if not k.startswith("_") and k != "generators"}
+
+    def draw(self, name, n):
+        """``n`` samples of stream ``name`` as an array (the vectorized interface)."""
+        rng = self.generators[name]
+        if name == "odometry":
+            return rng.normal(1.0, self.odometry_sigma, n)
+        if name == "detect":
+            return rng.normal(0.0, self.detect_sigma, n)
+        if name == "rfid":
+            return rng.normal(0.0, self.rfid_sigma, n)
+        if name == "inspect":
+            return rng.normal(1.0, self.inspect_sigma, n)
+        return rng.random(n)  # Dropouts
+
+    # --------------------------
+    # Per-Tick Hooks (NavEngine)
+    # --------------------------
+    def odometry(self):
+        """Factor on the distance actually driven this tick."""
+        return self._streams["odometry"].next() if self.odometry_sigma else 1.0
+
+    def inspection_ticks(self, mean):
+        if not self.inspect_sigma:
+            return mean
+        return max(1, round(mean * self._streams["inspect"].next()))
+
+    def detect_plant(self, engine, rows):
+        """NavEngine.find_plant with noise: index of the plant whose detection arrives now, or -1."""
+        index = -1
+        if not (self.detect_dropout and self._streams["detect_dropout"].next() < self.detect_dropout):
+            x = engine.pos[0]
+            if self.detect_sigma:
+                x += self._streams["detect"].next()
+            index = engine.plants.first_unchecked_near(x, rows, engine.config.check_distance)
+        if not self.detect_latency:
+            return index
+        pending = self._pending_plants
+        if index >= 0 and index not in pending:
+            pending[index] = engine.tick + self.detect_latency
+        for candidate, ready in sorted(pending.items(), key=lambda item: item[1]):
+            if ready > engine.tick:
+                break
+            del pending[candidate]
+            if not engine.plants.checked[candidate] and engine.plants.row[candidate] in rows:
+                return candidate
+        return -1
+
+    def rfid_offset(self):
+        """Error on where the reader fires along x (pixels)."""
+        return self._streams["rfid"].next() if self.rfid_sigma else 0.0
+
+    def tag_dropped(self):
+        """True if this tick's tag read is lost."""
+        return bool(self.rfid_dropout) and self._streams["rfid_dropout"].next() < self.rfid_dropout
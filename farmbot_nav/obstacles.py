@@ -0,0 +1,193 @@
+"""
+Obstacles, a uniform-grid spatial hash and range-sensor fakes.
+
+Obstacles (posts, irrigation lines, other robots) are circles. The
+SpatialHash buckets them by grid cell, so a query only looks at the cells
+around the bot; its cost depends on the query size and local density, not
+on how many obstacles the field has.
+
+Range sensors look along the direction of travel and return
+``(distance, obstacle)`` for the closest obstacle in the bot's corridor, or
+None. ObstacleGuard turns the reading into a stop (and, after a while, a
+reroute request to the strategy) inside NavEngine.drive().
+"""
+import collections
+import math
+from logging import INFO, WARNING
+
+Obstacle = collections.namedtuple("Obstacle", "x y radius kind", defaults=(5, "post"))
+
+# --------------------------
+# Spatial Hash
+# --------------------------
+class SpatialHash:
+    """Obstacles bucketed by ``cell_size`` grid cells (dict of cell -> list)."""
+
+    def __init__(self, cell_size=50):
+        self.cell_size = cell_size
+        self.cells = collections.defaultdict(list)
+        self.count = 0
+
+    def _span(self, lo, hi):
+        return range(int(lo // self.cell_size), int(hi // self.cell_size) + 1)
+
+    def insert(self, obstacle):
+        r = obstacle.radius
+        for cx in self._span(obstacle.x - r, obstacle.x + r):
+            for cy in self._span(obstacle.y - r, obstacle.y + r):
+                self.cells[cx, cy].append(obstacle)
+        self.count += 1
+
+    def remove(self, obstacle):
+        r = obstacle.radius
+        for cx in self._span(obstacle.x - r, obstacle.x + r):
+            for cy in self._span(obstacle.y - r, obstacle.y + r):
+                bucket = self.cells.get((cx, cy))
+                if bucket and obstacle in bucket:
+                    bucket.remove(obstacle)
+                    if not bucket:
+                        del self.cells[cx, cy]
+        self.count -= 1
+
+    def query_box(self, x0, y0, x1, y1):
+        """Obstacles whose bounding box may overlap the box (each reported once)."""
+        found = {}
+        cells = self.cells
+        for cx in self._span(x0, x1):
+            for cy in self._span(y0, y1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    for obstacle in bucket:
+                        found[id(obstacle)] = obstacle
+        return list(found.values())
+
+    def query_radius(self, x, y, radius):
+        """Obstacles whose circle comes within ``radius`` of (x, y)."""
+        return [o for o in self.query_box(x - radius, y - radius, x + radius, y + radius)
+                if math.hypot(o.x - x, o.y - y) < radius + o.radius]
+
+class ObstacleMap:
+    """The field's obstacles with a SpatialHash index."""
+
+    def __init__(self, obstacles=(), cell_size=50):
+        self.index = SpatialHash(cell_size)
+        self.obstacles = []
+        for obstacle in obstacles:
+            self.add(obstacle)
+
+    def add(self, obstacle):
+        obstacle = Obstacle(*obstacle)
+        self.obstacles.append(obstacle)
+        self.index.insert(obstacle)
+        return obstacle
+
+    def remove(self, obstacle):
+        self.obstacles.remove(obstacle)
+        self.index.remove(obstacle)
+
+    def __len__(self):
+        return len(self.obstacles)
+
+    def near(self, pos, radius):
+        return self.index.query_radius(pos[0], pos[1], radius)
+
+    def first_along(self, pos, direction, max_range, half_width):
+        """
+        ``(distance, obstacle)`` for the closest obstacle whose circle enters
+        the corridor of ``half_width`` ahead of ``pos`` along the axis-aligned
+        unit ``direction``, or None within ``max_range``.
+        """
+        (x, y), (ux, uy) = pos, direction
+        ex, ey = x + ux * max_range, y + uy * max_range
+        pad = half_width
+        best = None
+        for o in self.index.query_box(min(x, ex) - pad, min(y, ey) - pad,
+                                      max(x, ex) + pad, max(y, ey) + pad):
+            along = (o.x - x) * ux + (o.y - y) * uy
+            lateral = abs((o.x - x) * uy - (o.y - y) * ux)
+            reach = o.radius + half_width
+            if lateral >= reach or along + o.radius < 0:
+                continue
+            distance = max(0.0, along - math.sqrt(reach * reach - lateral * lateral))
+            if distance <= max_range and (best is None or distance < best[0]):
+                best = (distance, o)
+        return best
+
+# --------------------------
+# Range Sensor Fakes
+# --------------------------
+class SimulatedRangeSensor:
+    """Forward range sensor simulated from an ObstacleMap."""
+
+    def __init__(self, obstacles, max_range=60, half_width=8):
+        self.obstacles = obstacles
+        self.max_range = max_range
+        self.half_width = half_width  # Half the bot's width
+        self.reads = 0
+
+    def read(self, pos, direction):
+        self.reads += 1
+        return self.obstacles.first_along(pos, direction, self.max_range, self.half_width)
+
+class ScriptedRangeSensor:
+    """
+    Replays readings: ``readings`` is a list of ``(tick, distance)`` pairs,
+    with ``distance`` None for a clear path, each holding until the next.
+    """
+
+    def __init__(self, readings):
+        self.readings = sorted(readings)
+        self.tick = 0
+        self._i = -1
+        self.obstacles = None
+
+    def read(self, pos, direction):
+        self.tick += 1
+        while self._i + 1 < len(self.readings) and self.readings[self._i + 1][0] <= self.tick:
+            self._i += 1
+        distance = self.readings[self._i][1] if self._i >= 0 else None
+        return None if distance is None else (distance, None)
+
+# --------------------------
+# Guard
+# --------------------------
+class ObstacleGuard:
+    """
+    Stops the bot when the range sensor sees something within
+    ``stop_distance`` along the direction of travel. After ``reroute_after``
+    blocked ticks (0: never) it asks the strategy to ``reroute``; strategies
+    without a reroute keep waiting for the path to clear.
+    """
+
+    def __init__(self, sensor, stop_distance=25, reroute_after=30):
+        self.sensor = sensor
+        self.stop_distance = stop_distance
+        self.reroute_after = reroute_after
+        self.blocked_ticks = 0
+        self.stops = 0
+        self.reroutes = 0
+
+    def blocks(self, engine, dx, dy):
+        """True if the move (dx, dy) must not happen this tick."""
+        direction = ((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))
+        # The sensor sees from where the bot really is, as the RFID reader does, not from the estimate
+        reading = self.sensor.read(engine.true_pos, direction) if direction != (0, 0) else None
+        if reading is None or reading[0] > self.stop_distance:
+            if self.blocked_ticks:
+                engine.emit(INFO, "obstacle_cleared", waited=self.blocked_ticks)
+                self.blocked_ticks = 0
+            return False
+        engine.stop()
+        self.blocked_ticks += 1
+        if self.blocked_ticks == 1:
+            self.stops += 1
+            obstacle = reading[1]
+            engine.emit(WARNING, "obstacle_detected", distance=round(reading[0], 1),
+                        obstacle=tuple(obstacle) if obstacle else None)
+        if self.reroute_after and self.blocked_ticks >= self.reroute_after:
+            reroute = getattr(engine.strategy, "reroute", None)
+            if reroute is not None and reroute(reading, self):
+                self.reroutes += 1
+                self.blocked_ticks = 0
+                engine.emit(INFO, "rerouted", distance=round(reading[0], 1))
+        return True
@@ -0,0 +1,246 @@
+"""
+A* planner for headland transitions between row groups.
+
+Searches the OccupancyGrid over (cell, heading) states: a move to the next
+cell costs its travel time, turning in place costs the TurnModel time, so
+the path found is the quickest one, not only the shortest. Known obstacles
+are inflated by the bot's half width first.
+
+Paths are cached per transition ((from lane, direction), (to lane,
+direction)) under a signature of the field, grid and cost model. A
+PathCache can be saved to disk, so repeated runs over the same field reuse
+their paths instead of replanning. Every newly mapped obstacle changes the
+signature, so the cache keeps only the ``max_signatures`` most recently
+used signatures.
+"""
+import hashlib
+import heapq
+import itertools
+import json
+
+import numpy as np
+
+from farmbot_nav.checkpoint import atomic_write_json, load_checkpoint
+from farmbot_nav.mapping import OCCUPIED
+
+# Same heading numbering as route.py: east, south, west, north
+_STEPS = ((0, 1), (1, 0), (0, -1), (-1, 0))  # (d_row, d_col)
+MISSING = object()
+
+class PathCache:
+    """
+    Transition legs keyed by planner signature and transition; optionally
+    stored as JSON. Signatures are kept in least- to most-recently-used
+    order (which the JSON file preserves) and the oldest are evicted past
+    ``max_signatures``.
+    """
+
+    def __init__(self, path=None, max_signatures=32):
+        self.path = path
+        self.max_signatures = max_signatures
+        self.entries = (load_checkpoint(path) or {}) if path else {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dirty = False
+        self._evict()
+
+    def _touch(self, signature):
+        """Move ``signature`` to the most-recently-used end; returns its transitions."""
+        if next(reversed(self.entries), None) == signature:
+            return self.entries[signature]
+        transitions = self.entries[signature] = self.entries.pop(signature, {})
+        self.dirty = True  # The order is saved too
+        return transitions
+
+    def _evict(self):
+        while len(self.entries) > self.max_signatures:
+            del self.entries[next(iter(self.entries))]
+            self.evictions += 1
+            self.dirty = True
+
+    def get(self, signature, key):
+        """The cached legs, None for a transition known to have no path, or MISSING."""
+        transitions = self.entries.get(signature)
+        legs = MISSING if transitions is None else transitions.get(key, MISSING)
+        if legs is MISSING:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        self._touch(signature)
+        if legs is None:
+            return None
+        return [(kind, value if kind == "turn" else tuple(value)) for kind, value in legs]
+
+    def put(self, signature, key, legs):
+        self._touch(signature)[key] = None if legs is None else [list(leg) for leg in legs]
+        self.dirty = True
+        self._evict()
+
+    def save(self):
+        if self.path and self.dirty:
+            atomic_write_json(self.path, self.entries)
+            self.dirty = False
+
+class HeadlandPlanner:
+    """
+    Plans transitions for ``field`` on ``grid``. ``turns`` is a
+    route.TurnModel; ``half_width`` (pixels) inflates the obstacles.
+    """
+
+    def __init__(self, grid, field, config, turns, cache=None, half_width=8):
+        self.grid = grid
+        self.config = config
+        self.turns = turns
+        self.cache = cache if cache is not None else PathCache()
+        self.move_cost = grid.resolution / config.speed * config.tick_seconds
+        self.blocked = self._inflate(grid.cells == OCCUPIED, int(np.ceil(half_width / grid.resolution)))
+        self.signature = self._signature(field)
+        self.searches = 0
+
+    @staticmethod
+    def _inflate(blocked, cells):
+        """Grow the blocked mask by ``cells`` in every direction (square dilation)."""
+        grown = blocked.copy()
+        rows, cols = blocked.shape
+        for dr in range(-cells, cells + 1):
+            for dc in range(-cells, cells + 1):
+                src = blocked[max(0, -dr):rows - max(0, dr), max(0, -dc):cols - max(0, dc)]
+                grown[max(0, dr):rows - max(0, -dr), max(0, dc):cols - max(0, -dc)] |= src
+        return grown
+
+    def _signature(self, field):
+        digest = hashlib.sha1()
+        digest.update(json.dumps(field.to_dict(), sort_keys=True, default=list).encode())
+        digest.update(np.packbits(self.blocked).tobytes())
+        digest.update(repr((self.grid.origin, self.grid.resolution, self.config.speed,
+                            self.turns.quarter, self.turns.half)).encode())
+        return digest.hexdigest()[:16]
+
+    # --------------------------
+    # Queries
+    # --------------------------
+    def clear(self, legs, pos):
+        """True if no leg passes through an (inflated) blocked cell; off-grid parts count as clear."""
+        grid = self.grid
+        n_rows, n_cols = self.blocked.shape
+        for leg in legs:
+            if leg[0] == "turn":
+                continue
+            r0, c0 = grid.cell_of(*pos)
+            r1, c1 = grid.cell_of(*leg[1])
+            # Clamp to the grid: a negative start would wrap to the far edge
+            rows = slice(max(min(r0, r1), 0), min(max(r0, r1) + 1, n_rows))
+            cols = slice(max(min(c0, c1), 0), min(max(c0, c1) + 1, n_cols))
+            if self.blocked[rows, cols].any():
+                return False
+            pos = leg[1]
+        return True
+
+    def legs(self, key, start, heading, goal, goal_heading):
+        """
+        Cached legs from ``start`` (facing ``heading``) to ``goal`` facing
+        ``goal_heading``, or None if the grid has no path.
+        """
+        key = json.dumps(key)
+        legs = self.cache.get(self.signature, key)
+        if legs is MISSING:
+            legs = self.search(start, heading, goal, goal_heading)
+            self.cache.put(self.signature, key, legs)
+        return legs
+
+    def search(self, start, heading, goal, goal_heading):
+        """A* over (row, col, heading) with turn costs; returns legs or None."""
+        self.searches += 1
+        grid = self.grid
+        start_cell, goal_cell = grid.cell_of(*start), grid.cell_of(*goal)
+        if not (grid.in_bounds(*start_cell) and grid.in_bounds(*goal_cell)):
+            return None
+        blocked = self.blocked.copy()
+        # The end points themselves are never treated as blocked
+        blocked[start_cell] = blocked[goal_cell] = False
+        rows, cols = blocked.shape
+        move, quarter = self.move_cost, self.turns.quarter
+        tick = self.config.tick_seconds
+
+        def estimate(r, c, h):
+            dr, dc = goal_cell[0] - r, goal_cell[1] - c
+            bound = (abs(dr) + abs(dc)) * move
+            # Off the straight line ahead at least one turn is still needed
+            sr, sc = _STEPS[h]
+            ahead = (dr == 0 and dc * sc > 0) or (dc == 0 and dr * sr > 0) or (dr == dc == 0)
+            return bound if ahead else bound + quarter + tick
+
+        counter = itertools.count()
+        begin = (start_cell[0], start_cell[1], heading)
+        best = {begin: 0.0}
+        parent = {begin: None}
+        frontier = [(estimate(*begin), next(counter), begin)]
+        while frontier:
+            _, _, state = heapq.heappop(frontier)
+            r, c, h = state
+            cost = best[state]
+            if (r, c) == goal_cell:
+                return self._to_legs(state, parent, start, heading, goal, goal_heading)
+            steps = []
+            dr, dc = _STEPS[h]
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols and not blocked[nr, nc]:
+                steps.append(((nr, nc, h), move))
+            for turn in (1, 2, 3):
+                nh = (h + turn) % 4
+                steps.append(((r, c, nh), self.turns.cost(h, nh) + tick))
+            for nxt, step_cost in steps:
+                total = cost + step_cost
+                if total < best.get(nxt, float("inf")):
+                    best[nxt] = total
+                    parent[nxt] = state
+                    heapq.heappush(frontier, (total + estimate(*nxt), next(counter), nxt))
+        return None
+
+    def _to_legs(self, state, parent, start, heading, goal, goal_heading):
+        """Turn the cell path into turn/transit legs ending exactly on ``goal``."""
+        path = []
+        while state is not None:
+            path.append(state)
+            state = parent[state]
+        path.reverse()
+        # Corners: the last cell of each straight run
+        runs = []
+        for (r, c, h), nxt in zip(path, path[1:] + [None]):
+            if nxt is None or nxt[2] != h:
+                if not runs or runs[-1][0] != h or (r, c) != runs[-1][1]:
+                    runs.append((h, (r, c)))
+        grid = self.grid
+        goal_cell = grid.cell_of(*goal)
+        start_cell = grid.cell_of(*start)
+        legs, (x, y), current = [], start, heading
+        for h, (r, c) in runs:
+            if (r, c) == start_cell:
+                continue
+            cx, cy = grid.center_of(r, c)
+            # Snap to the exact goal coordinate on the goal's row or column
+            tx = goal[0] if c == goal_cell[1] else int(cx)
+            ty = goal[1] if r == goal_cell[0] else int(cy)
+            target = (tx, y) if h in (0, 2) else (x, ty)
+            if target == (x, y):
+                continue
+            if h != current:
+                legs.append(("turn", h))
+                current = h
+            legs.append(("transit", target))
+            x, y = target
+        if (x, y) != tuple(goal):
+            # Sub-cell remainder on the last axis
+            for target in ((goal[0], y), tuple(goal)):
+                if target != (x, y):
+                    dx, dy = target[0] - x, target[1] - y
+                    h = 0 if dx > 0 else 2 if dx < 0 else 1 if dy > 0 else 3
+                    if h != current:
+                        legs.append(("turn", h))
+                        current = h
+                    legs.append(("transit", target))
+                    x, y = target
+        if current != goal_heading:
+            legs.append(("turn", goal_heading))
+        return legs
@@ -0,0 +1,125 @@
+"""
+Compact checked-plant bookkeeping.
+
+Plants get a dense integer index (row by row, sorted by x within a row) and
+the checked state lives in a NumPy bool array instead of a set of tuples.
+Proximity tests use a binary search per row, draw-time coloring walks two
+flat arrays, and checkpoints store the state as packed bits.
+"""
+import base64
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+class PlantSet:
+    """
+    Field plants with a checked flag each.
+
+    Drop-in for the old ``checked_plants`` set where it matters:
+    ``plant in s``, ``s.add(plant)``, ``len(s)`` and iteration work on
+    (x, y) tuples, while the hot paths work on indices.
+    """
+
+    def __init__(self, plant_rows):
+        rows = [sorted(row) for row in plant_rows]
+        self.row_start = np.cumsum([0] + [len(row) for row in rows])
+        n = int(self.row_start[-1])
+        self.xy = np.array([p for row in rows for p in row], dtype=np.int32).reshape(n, 2)
+        self.row = np.repeat(np.arange(len(rows), dtype=np.int32), [len(row) for row in rows])
+        self.checked = np.zeros(n, dtype=bool)
+        self._row_by_y = {row[0][1]: r for r, row in enumerate(rows) if row}
+        # Per-row x lists for the proximity tests: bisect on a short list is far
+        # cheaper than a NumPy call at the sizes of a field row
+        self._row_xs = [[p[0] for p in row] for row in rows]
+        self._row_lo = [int(lo) for lo in self.row_start[:-1]]
+
+    @property
+    def size(self):
+        """Total number of plants in the field."""
+        return len(self.checked)
+
+    # --------------------------
+    # Index Lookups
+    # --------------------------
+    def index_of(self, plant):
+        """Dense index of the plant at (x, y), or -1 if there is none."""
+        r = self._row_by_y.get(plant[1])
+        if r is None:
+            return -1
+        lo, hi = self.row_start[r], self.row_start[r + 1]
+        i = lo + int(np.searchsorted(self.xy[lo:hi, 0], plant[0]))
+        if i < hi and self.xy[i, 0] == plant[0]:
+            return int(i)
+        return -1
+
+    def coords(self, index):
+        return (int(self.xy[index, 0]), int(self.xy[index, 1]))
+
+    def row_of(self, plant):
+        return int(self.row[self.index_of(plant)])
+
+    def first_unchecked_near(self, x, rows, distance):
+        """
+        Index of the first unchecked plant in ``rows`` whose x is strictly
+        within ``distance`` of ``x``, or -1. Costs a binary search per row.
+        """
+        checked = self.checked
+        for r in rows:
+            xs, lo = self._row_xs[r], self._row_lo[r]
+            for i in range(lo + bisect_right(xs, x - distance), lo + bisect_left(xs, x + distance)):
+                if not checked[i]:
+                    return i
+        return -1
+
+    def unchecked_near(self, x, rows, distance):
+        """Indices of every unchecked plant in ``rows`` strictly within ``distance`` of ``x``."""
+        checked = self.checked
+        found = []
+        for r in rows:
+            xs, lo = self._row_xs[r], self._row_lo[r]
+            for i in range(lo + bisect_right(xs, x - distance), lo + bisect_left(xs, x + distance)):
+                if not checked[i]:
+                    found.append(i)
+        return found
+
+    # --------------------------
+    # Set Interface
+    # --------------------------
+    def mark(self, index):
+        self.checked[index] = True
+
+    def add(self, plant):
+        i = self.index_of(plant)
+        if i < 0:
+            raise KeyError(plant)
+        self.checked[i] = True
+
+    def update(self, plants):
+        for plant in plants:
+            self.add(plant)
+
+    def __contains__(self, plant):
+        i = self.index_of(plant)
+        return i >= 0 and bool(self.checked[i])
+
+    def __len__(self):
+        return int(np.count_nonzero(self.checked))
+
+    def __iter__(self):
+        for x, y in self.xy[self.checked].tolist():
+            yield (x, y)
+
+    def items(self):
+        """(position, checked) for every plant; used to color plants at draw time."""
+        return zip(map(tuple, self.xy.tolist()), self.checked.tolist())
+
+    # --------------------------
+    # Checkpointing
+    # --------------------------
+    def to_bits(self):
+        """Checked state as packed bits (base64), one bit per plant."""
+        return base64.b64encode(np.packbits(self.checked).tobytes()).decode("ascii")
+
+    def load_bits(self, encoded):
+        bits = np.frombuffer(base64.b64decode(encoded), dtype=np.uint8)
+        self.checked[:] = np.unpackbits(bits, count=self.size).astype(bool)
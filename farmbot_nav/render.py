@@ -0,0 +1,64 @@
+"""
+Field view for NavEngine runs.
+
+Draws the plants, RFID tags, recent bot path and status text of an engine
+on a Display. The path is kept in a bounded deque; the original scripts
+appended to a list every frame and redrew the whole run's path each tick.
+"""
+import collections
+
+# Colors
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+YELLOW = (255, 255, 0)
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+PATH = (200, 200, 200)
+OBSTACLE = (90, 90, 90)
+
+class FieldRenderer:
+    """Draws one frame per ``draw()`` call."""
+
+    def __init__(self, display, engine, bot_size=15, path_length=2000):
+        self.display = display
+        self.engine = engine
+        self.bot_size = bot_size
+        self.path = collections.deque(maxlen=path_length)
+
+    def draw(self, status=None):
+        """Draw the field; ``status`` replaces the "State:" line (e.g. "Manual Mode")."""
+        engine = self.engine
+        display = self.display
+        screen = display.screen
+        pygame = display.pygame
+        screen.fill(WHITE)
+
+        # Draw plants
+        for pos, checked in engine.plants.items():
+            pygame.draw.circle(screen, YELLOW if checked else GREEN, pos, 10)
+
+        for x, y, radius, *_ in engine.field.obstacles:
+            pygame.draw.circle(screen, OBSTACLE, (x, y), radius)
+
+        # Draw RFID markers
+        for tag in engine.tags.by_id.values():
+            pygame.draw.rect(screen, RED, (tag.x, tag.y, 20, 20))
+
+        # Record bot path for visualization
+        pos = (engine.pos[0], engine.pos[1])
+        if not self.path or self.path[-1] != pos:
+            self.path.append(pos)
+        if len(self.path) > 2:
+            pygame.draw.lines(screen, PATH, False, list(self.path), 1)
+
+        if engine.direction == engine.strategy.check_state:
+            for index in engine.check_indices:
+                pygame.draw.line(screen, BLUE, engine.pos, engine.plants.coords(index), 2)
+
+        pygame.draw.rect(screen, BLUE, (*engine.pos, self.bot_size, self.bot_size))
+
+        # Status text (fonts are cached by the Display)
+        lines = [status or f"State: {engine.direction}"] + engine.strategy.hud()
+        for i, line in enumerate(lines):
+            display.text(line, (10, 10 + 30 * i))
+        pygame.display.flip()
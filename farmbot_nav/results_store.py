@@ -0,0 +1,181 @@
+"""
+Persistent inspection results.
+
+Results are stored in SQLite keyed by field ID, run ID and plant coordinate,
+so plant health can be compared across runs. ``record()`` only enqueues;
+a writer thread inserts in batches so the control loop never touches disk.
+"""
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id     TEXT PRIMARY KEY,
+    field_id   TEXT NOT NULL,
+    started_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS inspection_results (
+    id          INTEGER PRIMARY KEY,
+    field_id    TEXT NOT NULL,
+    run_id      TEXT NOT NULL,
+    plant_x     INTEGER NOT NULL,
+    plant_y     INTEGER NOT NULL,
+    row         INTEGER,
+    analyzer    TEXT,
+    ok          INTEGER NOT NULL,
+    data        TEXT,
+    error       TEXT,
+    duration    REAL,
+    recorded_at REAL NOT NULL
+);
+-- "all results for plant X" (across runs)
+CREATE INDEX IF NOT EXISTS idx_results_plant
+    ON inspection_results (field_id, plant_x, plant_y, run_id);
+-- "all plants in row R for run N"
+CREATE INDEX IF NOT EXISTS idx_results_run_row
+    ON inspection_results (field_id, run_id, row);
+"""
+
+INSERT_RESULT = """
+INSERT INTO inspection_results
+    (field_id, run_id, plant_x, plant_y, row, analyzer, ok, data, error, duration, recorded_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def new_run_id():
+    """Sortable, unique run ID (start time plus a random suffix)."""
+    return time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+def _connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+class ResultsStore:
+    """
+    SQLite store of InspectionResults for one (field, run).
+
+    Writes are batched by a background thread: a batch is committed when
+    ``batch_size`` rows are waiting or ``flush_interval`` seconds have passed.
+    """
+
+    def __init__(self, path, field_id, run_id=None, batch_size=64, flush_interval=1.0):
+        self.path = path
+        self.field_id = field_id
+        self.run_id = run_id or new_run_id()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self._queue = queue.SimpleQueue()
+        self._flushed = threading.Condition()
+        self._enqueued = 0
+
+        conn = _connect(path)
+        with conn:
+            conn.executescript(SCHEMA)
+            conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, field_id, started_at) VALUES (?, ?, ?)",
+                (self.run_id, self.field_id, time.time()),
+            )
+        conn.close()
+
+        self._thread = threading.Thread(target=self._writer, name="results-writer", daemon=True)
+        self._thread.start()
+
+    # --------------------------
+    # Writing (called from the control loop / inspection callbacks)
+    # --------------------------
+    def record(self, result, row=None):
+        """Queue one InspectionResult for writing. Never blocks on disk."""
+        self._enqueued += 1
+        self._queue.put((
+            self.field_id, self.run_id, result.plant[0], result.plant[1], row,
+            result.analyzer, int(result.ok),
+            json.dumps(result.data) if result.data is not None else None,
+            result.error, result.duration, time.time(),
+        ))
+
+    def _writer(self):
+        conn = _connect(self.path)
+        batch = []
+        closing = False
+        while not closing:
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            if batch:
+                with conn:
+                    conn.executemany(INSERT_RESULT, batch)
+                self.rows_written += len(batch)
+                batch = []
+            with self._flushed:
+                self._flushed.notify_all()
+        conn.close()
+
+    def flush(self, timeout=None):
+        """Wait until everything recorded so far has been committed."""
+        target = self._enqueued
+        with self._flushed:
+            return self._flushed.wait_for(lambda: self.rows_written >= target, timeout)
+
+    def close(self):
+        """Write out pending rows and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    # --------------------------
+    # Queries
+    # --------------------------
+    def results_for_plant(self, plant, run_id=None):
+        """All results for one plant in this field, across runs unless ``run_id`` is given."""
+        sql = ("SELECT run_id, row, analyzer, ok, data, error, duration, recorded_at "
+               "FROM inspection_results WHERE field_id = ? AND plant_x = ? AND plant_y = ?")
+        args = [self.field_id, plant[0], plant[1]]
+        if run_id is not None:
+            sql += " AND run_id = ?"
+            args.append(run_id)
+        return self._query(sql + " ORDER BY recorded_at", args)
+
+    def plants_in_row(self, row, run_id=None):
+        """All results for plants in ``row`` during ``run_id`` (default: this run)."""
+        return self._query(
+            "SELECT plant_x, plant_y, analyzer, ok, data, error, duration, recorded_at "
+            "FROM inspection_results WHERE field_id = ? AND run_id = ? AND row = ? "
+            "ORDER BY plant_x, plant_y",
+            (self.field_id, run_id or self.run_id, row),
+        )
+
+    def runs(self):
+        """Run IDs recorded for this field, oldest first."""
+        rows = self._query(
+            "SELECT run_id FROM runs WHERE field_id = ? ORDER BY started_at",
+            (self.field_id,),
+        )
+        return [r["run_id"] for r in rows]
+
+    def _query(self, sql, args):
+        conn = _connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = [dict(r) for r in conn.execute(sql, args)]
+        finally:
+            conn.close()
+        for r in rows:
+            if r.get("data") is not None:
+                r["data"] = json.loads(r["data"])
+        return rows
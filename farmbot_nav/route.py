@@ -0,0 +1,246 @@
+"""
+Route optimizer over row segments.
+
+Each lane (the path between a row group's two rows) is a segment that can
+be scanned in either direction. Moving between segments costs travel time
+plus turn time (TurnModel); scanning and plant checks cost the same in any
+order. RoutePlanner picks the segment order and scan directions that
+minimize total time with a Held-Karp DP over (visited set, last segment,
+direction), falling back to nearest-neighbour for very large fields.
+
+The resulting legs are driven by the "optimized" and "dual_sided"
+strategies; ``report()`` compares them with the fixed routes of the other
+modes:
+
+    python -m farmbot_nav.route
+"""
+from farmbot_nav.engine import Field, NavConfig, simulate
+
+EAST, SOUTH, WEST, NORTH = 0, 1, 2, 3
+HEADINGS = {EAST: (1, 0), SOUTH: (0, 1), WEST: (-1, 0), NORTH: (0, -1)}
+HEADING_NAMES = "ESWN"
+
+class TurnModel:
+    """Seconds for a heading change: a point turn for 90 degrees, a spin for 180."""
+
+    def __init__(self, quarter=1.0, half=2.0):
+        self.quarter = quarter
+        self.half = half
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.turn_seconds, config.turn_180_seconds)
+
+    def cost(self, heading, new_heading):
+        steps = (new_heading - heading) % 4
+        if steps == 0:
+            return 0.0
+        return self.half if steps == 2 else self.quarter
+
+class RoutePlan:
+    """
+    A planned route: ``order`` is a list of (group, heading) scans and
+    ``legs`` the moves that drive it, each one of
+    ``("turn", heading)``, ``("transit", (x, y))`` or ``("scan", (x, y), group)``.
+    """
+
+    def __init__(self, order, legs, travel_seconds, turn_seconds, check_seconds, turns):
+        self.order = order
+        self.legs = legs
+        self.travel_seconds = travel_seconds
+        self.turn_seconds = turn_seconds
+        self.check_seconds = check_seconds
+        self.turns = turns
+
+    @property
+    def seconds(self):
+        return self.travel_seconds + self.turn_seconds + self.check_seconds
+
+    def describe(self):
+        return " ".join(f"{group}{HEADING_NAMES[heading]}" for group, heading in self.order)
+
+class RoutePlanner:
+    """Plans the segment order for a Field under a NavConfig and TurnModel."""
+
+    def __init__(self, field=None, config=None, turns=None, exact_limit=12, headland=None):
+        self.field = field or Field()
+        self.config = config or NavConfig()
+        self.turns = turns or TurnModel.from_config(self.config)
+        self.exact_limit = exact_limit  # Largest segment count planned exactly
+        self.headland = headland  # planner.HeadlandPlanner for blocked transitions
+
+    # --------------------------
+    # Cost Model
+    # --------------------------
+    def segment(self, group, heading):
+        """Start and end point of scanning ``group``'s lane toward ``heading``."""
+        y = self.field.lanes[group]
+        left, right = (self.field.left_x, y), (self.field.right_x, y)
+        return (left, right) if heading == EAST else (right, left)
+
+    def connect(self, pos, heading, target, final_heading):
+        """Legs from ``pos`` (facing ``heading``) to ``target`` facing ``final_heading``: vertical first."""
+        legs = []
+        x, y = pos
+        for dx, dy in ((0, target[1] - y), (target[0] - x, 0)):
+            if dx == dy == 0:
+                continue
+            step = (dx > 0) - (dx < 0), (dy > 0) - (dy < 0)
+            new_heading = next(h for h, v in HEADINGS.items() if v == step)
+            if new_heading != heading:
+                legs.append(("turn", new_heading))
+                heading = new_heading
+            x, y = x + dx, y + dy
+            legs.append(("transit", (x, y)))
+        if final_heading != heading:
+            legs.append(("turn", final_heading))
+        return legs
+
+    def legs_cost(self, legs, pos, heading):
+        """Seconds for ``legs`` as the engine counts them: ticks of travel plus turn time."""
+        tick = self.config.tick_seconds
+        travel = turning = 0.0
+        turns = 0
+        for leg in legs:
+            if leg[0] == "turn":
+                turning += self.turns.cost(heading, leg[1]) + tick
+                heading = leg[1]
+                turns += 1
+            else:
+                distance = abs(leg[1][0] - pos[0]) + abs(leg[1][1] - pos[1])
+                travel += -(-distance // self.config.speed) * tick
+                pos = leg[1]
+        return travel, turning, turns
+
+    def transition(self, pos, heading, group, scan_heading, origin=None):
+        """
+        (seconds, legs) to reach the start of a segment, ready to scan it.
+        ``origin`` is the (group, heading) scan just finished, None at the
+        start. When the direct legs cross a known obstacle the headland
+        planner's path is used instead.
+        """
+        start, _ = self.segment(group, scan_heading)
+        legs = self.connect(pos, heading, start, scan_heading)
+        if self.headland is not None and not self.headland.clear(legs, pos):
+            detour = self.headland.legs([origin, (group, scan_heading)],
+                                        pos, heading, start, scan_heading)
+            if detour is not None:
+                legs = detour
+        travel, turning, _ = self.legs_cost(legs, pos, heading)
+        return travel + turning, legs
+
+    # --------------------------
+    # Planning
+    # --------------------------
+    def plan(self):
+        """Return the fastest RoutePlan found."""
+        n = self.field.groups
+        states = [(g, h) for g in range(n) for h in (EAST, WEST)]
+        start = (tuple(self.field.start_pos), EAST)
+
+        def after(state):
+            return self.segment(*state)[1], state[1]
+
+        cost = {}
+        for a in [None] + states:
+            pos, heading = start if a is None else after(a)
+            for b in states:
+                if a is None or a[0] != b[0]:
+                    cost[a, b] = self.transition(pos, heading, *b, origin=a)[0]
+
+        if n <= self.exact_limit:
+            order = self._held_karp(n, states, cost)
+        else:
+            order = self._nearest_neighbour(n, states, cost)
+        return self._build(order, start)
+
+    def _held_karp(self, n, states, cost):
+        # best[(mask, state)] = (seconds, previous state)
+        best = {(1 << s[0], s): (cost[None, s], None) for s in states}
+        full = (1 << n) - 1
+        # A superset mask is always numerically larger, so ascending order is a valid DP order
+        for mask in range(1, full):
+            for last in states:
+                entry = best.get((mask, last))
+                if entry is None:
+                    continue
+                for s in states:
+                    if mask & (1 << s[0]):
+                        continue
+                    key = (mask | 1 << s[0], s)
+                    total = entry[0] + cost[last, s]
+                    if key not in best or total < best[key][0]:
+                        best[key] = (total, last)
+        last = min((s for s in states if (full, s) in best), key=lambda s: best[full, s][0])
+        order, mask = [], full
+        while last is not None:
+            order.append(last)
+            prev = best[mask, last][1]
+            mask &= ~(1 << last[0])
+            last = prev
+        return order[::-1]
+
+    def _nearest_neighbour(self, n, states, cost):
+        order, last, done = [], None, set()
+        while len(done) < n:
+            last = min((s for s in states if s[0] not in done), key=lambda s: cost[last, s])
+            order.append(last)
+            done.add(last[0])
+        return order
+
+    def _build(self, order, start):
+        pos, heading = start
+        legs, origin = [], None
+        for group, scan_heading in order:
+            legs += self.transition(pos, heading, group, scan_heading, origin)[1]
+            origin = (group, scan_heading)
+            pos = self.segment(group, scan_heading)[1]
+            heading = scan_heading
+            legs.append(("scan", pos, group))
+        travel, turning, turns = self.legs_cost(legs, *start)
+        plants = sum(len(row) for row in self.field.plants)
+        checks = plants * self.config.check_duration * self.config.tick_seconds
+        return RoutePlan(order, legs, travel, turning, checks, turns)
+
+def plan_route(field=None, config=None, turns=None, headland=None):
+    return RoutePlanner(field, config, turns, headland=headland).plan()
+
+# --------------------------
+# Report
+# --------------------------
+FIXED_MODES = ("align", "point_turn", "two_sided")
+PLANNED_MODES = ("optimized", "dual_sided")
+
+def compare(field=None, config=None, modes=FIXED_MODES):
+    """Simulate the fixed-route and planned modes; returns (plan, {mode: engine})."""
+    plan = plan_route(field, config)
+    runs = {mode: simulate(field, mode, config) for mode in modes + PLANNED_MODES}
+    return plan, runs
+
+def report(field=None, config=None, modes=FIXED_MODES):
+    """Time and stop counts per mode, with the savings of the planned modes over the fixed ones."""
+    plan, runs = compare(field, config, modes)
+    lines = [f"optimized route {plan.describe()}: expected {plan.seconds:.1f} s "
+             f"(travel {plan.travel_seconds:.1f} s, {plan.turns} turns {plan.turn_seconds:.1f} s, "
+             f"checks {plan.check_seconds:.1f} s)",
+             f"{'mode':<11} {'time':>8} {'stops':>6} {'plants':>7}"]
+    for mode, engine in runs.items():
+        if not engine.done:
+            lines.append(f"{mode:<11} did not complete in {engine.tick} ticks")
+            continue
+        lines.append(f"{mode:<11} {engine.sim_time:7.1f}s {engine.plant_stops:6} "
+                     f"{len(engine.plants):3}/{engine.plants.size}")
+    optimized, dual = runs["optimized"], runs["dual_sided"]
+    for mode in modes:
+        engine = runs[mode]
+        if not engine.done:
+            continue
+        saved = engine.sim_time - optimized.sim_time
+        lines.append(f"vs {mode:<11} optimized saves {saved:6.1f} s "
+                     f"({100.0 * saved / engine.sim_time:.0f}%); dual_sided saves "
+                     f"{engine.sim_time - dual.sim_time:6.1f} s with {dual.plant_stops} stops "
+                     f"instead of {engine.plant_stops}")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    print(report())
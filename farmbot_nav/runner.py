@@ -0,0 +1,390 @@
+"""
+Run one navigation mode with its display, motors and background services.
+
+Every script in the repo root is a thin wrapper around ``main()``; the
+strategy (``mode``) is the only thing that differs between them. Usage::
+
+    python -m farmbot_nav --mode point_turn
+    python -m farmbot_nav --mode align --manual        # 'm' toggles manual override
+    python -m farmbot_nav --mode two_sided --headless  # no window, simulated time
+    python -m farmbot_nav --mode optimized --viewer    # draw in a separate process
+"""
+import argparse
+import math
+import subprocess
+import sys
+import time
+
+from farmbot_nav.engine import Field, NavEngine
+from farmbot_nav.eventlog import EventLog, JsonlSink, TextSink, INFO
+from farmbot_nav.hardware import MotorBackend
+from farmbot_nav.metrics import MetricsRegistry
+from farmbot_nav.motor_scheduler import MotorScheduler, sleep_until
+from farmbot_nav.startup import StartupTimer
+from farmbot_nav.strategies import STRATEGIES
+
+# --------------------------
+# Control-Loop Metrics (scrape http://127.0.0.1:9108/metrics)
+# --------------------------
+TICK_BUDGET = 0.050  # Seconds per loop iteration before it counts as an overrun
+WATCHDOG_TIMEOUT = 0.25  # Seconds without a loop heartbeat before the motors are stopped
+TICK_PERIOD = 0.030  # Seconds between tick deadlines unless headless
+FIELD_MAP_PATH = "field_map.npz"  # Holds one field's map; a run on another field starts a fresh one
+PATH_CACHE_PATH = "path_cache.json"
+TELEMETRY_HOST = "127.0.0.1"  # Drive commands are unauthenticated; bind wider only on purpose
+
+class LoopMetrics:
+    """Control-loop health metrics, updated once per tick."""
+
+    def __init__(self, registry):
+        self.loop_ticks = registry.counter("nav_loop_ticks_total", "Control loop iterations")
+        self.loop_hz = registry.gauge("nav_loop_frequency_hz", "Control loop frequency over the last tick")
+        self.tick_seconds = registry.histogram("nav_tick_seconds", "Wall time per control loop iteration")
+        self.tick_overruns = registry.counter("nav_tick_overruns_total", "Iterations longer than the tick budget")
+        self.state_seconds = registry.counter("nav_state_seconds_total", "Time spent in each navigation state", ("state",))
+        self.plants_checked = registry.counter("nav_plants_checked_total", "Plants checked this run")
+        self.plants_per_minute = registry.gauge("nav_plants_per_minute", "Plants checked per minute since start")
+        self.gpio_writes = registry.counter("nav_gpio_writes_total", "GPIO output writes")
+        self.watchdog_trips = registry.counter("nav_watchdog_trips_total", "Motor stops forced by the watchdog")
+        self.tag_residual = registry.histogram("nav_tag_residual_pixels", "Pose error corrected at each tag read",
+                                               buckets=(1, 2, 5, 10, 20, 50, 100))
+        self.turn_error = registry.histogram("nav_turn_timing_error_seconds",
+                                             "Error of the achieved duration of each timed motor command",
+                                             ("command",), buckets=(1e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05))
+        self._start = self._last = None
+        self._state = None
+
+    def tick(self, state):
+        """Record the iteration that just ended; ``state`` is the one the next iteration runs in."""
+        now = time.perf_counter()
+        if self._last is None:
+            self._start = self._last = now
+        dt = now - self._last
+        self._last = now
+        self.loop_ticks.inc()
+        self.tick_seconds.observe(dt)
+        if dt > TICK_BUDGET:
+            self.tick_overruns.inc()
+        if dt > 0:
+            self.loop_hz.set(1.0 / dt)
+        if self._state is not None:
+            self.state_seconds.labels(self._state).inc(dt)
+        self._state = state
+        if now > self._start:
+            self.plants_per_minute.set(60.0 * self.plants_checked.value / (now - self._start))
+
+def main(mode="point_turn", field=None, config=None, simulate=None, headless=False,
+         manual=False, services=None, caption="Farmbot Navigation Simulation",
+         max_ticks=None, startup=None, motor_map=None, watchdog=None, scheduler=None,
+         viewer=False, telemetry_host=TELEMETRY_HOST):
+    """
+    Run one field in ``mode`` and return the finished NavEngine.
+
+    ``simulate`` selects FakeGPIO (None: only when RPi.GPIO is missing).
+    ``headless`` skips the window and turn delays. ``services`` starts the
+    camera, inspection pool, results store, telemetry, metrics endpoint and
+    checkpointing (default: on unless headless). ``manual`` adds the
+    arrow-key override toggled with 'm' (keys from the window, or with
+    ``viewer`` from the terminal). ``motor_map`` overrides the
+    strategy's pin levels. ``watchdog`` stops the motors if the loop stops
+    heartbeating (default: on unless headless). ``scheduler`` runs timed
+    turns on a deadline thread and paces the loop to fixed tick deadlines
+    (default: on unless headless). ``viewer`` publishes the state to shared
+    memory for a separate viewer process (viewer.py) instead of drawing here.
+    ``telemetry_host`` is the interface the telemetry/teleop server binds.
+    """
+    startup = startup or StartupTimer()
+    startup.mark("imports")
+    if services is None:
+        services = not headless
+    if watchdog is None:
+        watchdog = not headless
+    if scheduler is None:
+        scheduler = not headless
+    # With a viewer the window is in another process; keys then come from this terminal
+    manual = manual and not headless and (not viewer or sys.stdin.isatty())
+
+    registry = MetricsRegistry()
+    loop = LoopMetrics(registry)
+    sinks = [TextSink()]
+    if services:
+        sinks.insert(0, JsonlSink("nav_events.jsonl"))
+    # Structured event log, written from a background thread (raise to DEBUG for turn details)
+    events = EventLog(sinks, level=INFO)
+
+    def first_motor_command():
+        startup.mark("first_motor_command")
+        events.info("cold_start", engine.tick, engine.direction, engine.pos,
+                    report=startup.report(), gpio=backend.name)
+
+    # GPIO pins 7/11/13/15 are set up on the first motor command, not here
+    backend = MotorBackend(simulate=simulate, on_write=loop.gpio_writes.inc,
+                           on_first_command=first_motor_command)
+    field_map = path_cache = None
+    if services:
+        from farmbot_nav.mapping import OccupancyGrid
+        from farmbot_nav.planner import PathCache
+        # Occupancy map of the driven path and sensed obstacles, kept across runs; the
+        # route modes plan headland transitions around it and cache the paths
+        field = field or Field()
+        field_map = OccupancyGrid.load_or_create(FIELD_MAP_PATH, field)
+        path_cache = PathCache(PATH_CACHE_PATH)
+    sleep = None if headless else time.sleep
+    if watchdog:
+        from farmbot_nav.watchdog import Watchdog
+
+        def watchdog_tripped(gap):
+            loop.watchdog_trips.inc()
+            events.warning("watchdog_tripped", engine.tick, engine.direction, engine.pos, gap=round(gap, 3))
+
+        def watchdog_recovered(stopped):
+            # The watchdog wrote the pins; resend the current command on the next tick
+            engine.motors.current = None
+            events.info("watchdog_recovered", engine.tick, engine.direction, engine.pos,
+                        stopped=round(stopped, 3))
+
+        # Timed turns sleep through the watchdog so it knows how long they may take
+        watchdog = Watchdog(backend, WATCHDOG_TIMEOUT, on_trip=watchdog_tripped, on_recover=watchdog_recovered)
+        sleep = watchdog.sleep if sleep is not None else None
+    if scheduler:
+        def turn_done(command):
+            loop.turn_error.labels(command.label).observe(abs(command.duration_error))
+
+        scheduler = MotorScheduler(backend, on_done=turn_done).start()
+    engine = NavEngine(field, mode, config, backend, sleep=sleep, motor_map=motor_map,
+                       field_map=field_map, path_cache=path_cache, scheduler=scheduler or None)
+
+    display = renderer = pygame = publisher = None
+    if viewer:
+        from farmbot_nav.viewer import SHM_NAME, StatePublisher
+        # pygame stays out of this process; the viewer can be closed and reopened freely
+        publisher = StatePublisher(engine, SHM_NAME)
+        subprocess.Popen([sys.executable, "-m", "farmbot_nav.viewer", "--name", SHM_NAME])
+    elif not headless:
+        from farmbot_nav.display import Display
+        from farmbot_nav.render import FieldRenderer
+        display = Display(800, 400, caption)
+        display.screen
+        pygame = display.pygame
+        renderer = FieldRenderer(display, engine)
+        startup.mark("display")
+
+    cameras = []
+    inspection_pool = results_store = telemetry = metrics_server = checkpointer = None
+    manual_driver = key_reader = None
+    manual_override = False
+    inspection_results = {}  # plant -> list of InspectionResult
+    last_tag = None  # Navigation state captured at the last RFID tag read
+
+    def nav_state():
+        """Snapshot of everything needed to resume this run."""
+        state = engine.snapshot()
+        state["last_tag"] = last_tag
+        return state
+
+    def on_event(engine, level, event, fields):
+        nonlocal last_tag
+        events.emit(level, event, engine.tick, engine.direction, engine.pos, **fields)
+        if event == "localized":
+            loop.tag_residual.observe(math.hypot(*fields["residual"]))
+        elif event == "plant_checked":
+            loop.plants_checked.inc()
+            if inspection_pool is not None:
+                # Workers read the frame straight from the capture ring of the plant's sensor
+                camera = cameras[fields["sensor"] % len(cameras)]
+                inspection_pool.submit(fields["plant"], engine.tick, camera.latest())
+        elif event == "rfid_detected" and checkpointer is not None:
+            last_tag = engine.snapshot()
+            checkpointer.save(nav_state(), engine.tick)
+        elif event == "run_completed" and checkpointer is not None:
+            checkpointer.clear()
+
+    engine.add_listener(on_event)
+
+    if services:
+        from farmbot_nav.camera import FrameCapture, FrameStatsAnalyzer, SyntheticFrameSource
+        from farmbot_nav.checkpoint import Checkpointer, load_checkpoint
+        from farmbot_nav.inspection import InspectionPool, StubAnalyzer
+        from farmbot_nav.mapping import Mapper
+        from farmbot_nav.metrics import MetricsHTTPServer
+        from farmbot_nav.results_store import ResultsStore
+
+        # Camera (swap in OpenCVFrameSource on the robot); paired checks use one per row side,
+        # and both plants of a stop are submitted together so the workers inspect them concurrently
+        cameras = [FrameCapture(SyntheticFrameSource(), slots=32).start()  # ~1 s of frames at 30 fps
+                   for _ in range(2 if engine.paired else 1)]
+        # Inspection results persist across runs (batched writes on a background thread)
+        results_store = ResultsStore("inspections.db", field_id="field-1")
+        # Plant inspection (analysis runs in worker processes, off the control loop)
+        inspection_pool = InspectionPool(
+            [StubAnalyzer(), FrameStatsAnalyzer()], workers=2, max_pending=8,
+            on_result=lambda result: results_store.record(result, row=engine.plants.row_of(result.plant)),
+        )
+        metrics_server = MetricsHTTPServer(registry, port=9108).start()
+
+        Mapper(field_map).attach(engine)
+
+        checkpointer = Checkpointer("nav_checkpoint.json", interval=60)
+        resume = load_checkpoint(checkpointer.path)
+        if resume and resume.get("mode") == mode:
+            engine.plants.load_bits(resume["checked_plants"])
+            last_tag = resume["last_tag"]
+            if last_tag:
+                # Resume from the last RFID tag seen rather than the start position
+                engine.restore(last_tag, checked=False)
+            events.info("run_resumed", engine.tick, engine.direction, engine.pos,
+                        plants_checked=len(engine.plants))
+
+    if manual:
+        from farmbot_nav.manual_input import ManualDriver, PygameKeyReader, TerminalKeyReader
+        motor_map = engine.motors.mapping
+        vertical = motor_map.get("down", motor_map["backward"])
+        # Keys are read on their own thread and applied by the driver thread as soon as
+        # they arrive, not on the next tick. Held keys repeat every 50 ms; if they stop
+        # arriving the deadman stops the motors.
+        manual_driver = ManualDriver({
+            "right": lambda: backend.set(*motor_map["forward"]),
+            "left": lambda: backend.set(*motor_map["backward"]),
+            "up": lambda: backend.set(*vertical),
+            "down": lambda: backend.set(*vertical),
+        }, stop=backend.stop, deadman=0.3).start()
+        if display is not None:
+            key_reader = PygameKeyReader(manual_driver, pygame).start()
+        else:
+            key_reader = TerminalKeyReader(manual_driver).start()
+        manual_moves = {"right": (1, 0), "left": (-1, 0), "up": (0, -1), "down": (0, 1)}
+
+    if services or manual:
+        from farmbot_nav.telemetry import TelemetryServer
+        # Telemetry / remote teleop on UDP (network drive commands only apply in manual mode)
+        telemetry = TelemetryServer(host=telemetry_host, port=5005, rate=10, driver=manual_driver,
+                                    drive_enabled=lambda: manual_override).start()
+    startup.mark("services")
+
+    # --------------------------
+    # Main Loop
+    # --------------------------
+    running = True
+    if watchdog:
+        watchdog.start()
+    next_tick = time.perf_counter()
+    try:
+        while running and not engine.done:
+            if max_ticks is not None and engine.tick >= max_ticks:
+                break
+            if watchdog:
+                watchdog.heartbeat()
+            loop.tick("MANUAL" if manual_override else engine.direction)
+            if checkpointer is not None and checkpointer.due(engine.tick):
+                checkpointer.save(nav_state(), engine.tick)
+
+            if key_reader is not None:
+                # The reader thread owns the key events; the override flips between ticks
+                if key_reader.quit_requested.is_set():
+                    running = False
+                if key_reader.take_toggle():
+                    manual_override = not manual_override
+                    key_reader.enabled = manual_override
+                    manual_driver.release()
+                    # The driver thread wrote the pins; resend the next autonomous command
+                    engine.motors.current = None
+            elif display is not None:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        running = False
+
+            # Collect finished inspections without waiting on the analyzers
+            if inspection_pool is not None:
+                for result in inspection_pool.drain():
+                    inspection_results.setdefault(result.plant, []).append(result)
+
+            if manual_override:
+                # Motors are driven by manual_driver; only mirror the motion on screen
+                dx, dy = manual_moves.get(manual_driver.active, (0, 0))
+                engine.pos[0] += dx * engine.config.speed
+                engine.pos[1] += dy * engine.config.speed
+            else:
+                engine.step()
+
+            if renderer is not None:
+                renderer.draw("Manual Mode" if manual_override else None)
+            if publisher is not None:
+                publisher.publish("Manual Mode" if manual_override else None)
+            if telemetry is not None:
+                telemetry.publish(engine.tick, engine.pos,
+                                  "MANUAL" if manual_override else engine.direction, engine.plants)
+            if not headless:
+                if scheduler:
+                    # Fixed tick deadlines: the per-tick moves track wall time whatever the work took
+                    next_tick = max(next_tick + TICK_PERIOD, time.perf_counter())
+                    sleep_until(next_tick)
+                else:
+                    time.sleep(TICK_PERIOD)
+
+    except KeyboardInterrupt:
+        events.warning("interrupted", engine.tick, engine.direction, engine.pos)
+    finally:
+        if backend.initialized:
+            # Motors off before the threads that drive them go; latched so none restarts them
+            backend.stop(latch=True)
+        if watchdog:
+            watchdog.stop()
+            print(watchdog.report())
+        if scheduler:
+            scheduler.stop()
+            print(scheduler.report())
+        if telemetry is not None:
+            telemetry.stop()
+        if key_reader is not None:
+            key_reader.stop()
+        if manual_driver is not None:
+            manual_driver.stop()
+            print(manual_driver.latency_report())
+        if metrics_server is not None:
+            metrics_server.stop()
+        events.close()
+        if checkpointer is not None:
+            checkpointer.close()
+        if inspection_pool is not None:
+            inspection_pool.close()
+        if results_store is not None:
+            results_store.close()
+        if field_map is not None:
+            field_map.save(FIELD_MAP_PATH)
+        if path_cache is not None:
+            path_cache.save()
+        for camera in cameras:
+            camera.stop()
+        backend.cleanup()
+        if publisher is not None:
+            publisher.close()
+        if display is not None:
+            display.close()
+    return engine
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="farmbot_nav", description="Run a Farmbot navigation mode.")
+    parser.add_argument("--mode", choices=sorted(STRATEGIES), default="point_turn")
+    parser.add_argument("--simulate", action="store_true", default=None,
+                        help="use FakeGPIO even if RPi.GPIO is installed")
+    parser.add_argument("--headless", action="store_true", help="no window; turns take simulated time")
+    parser.add_argument("--manual", action="store_true", help="enable the arrow-key manual override")
+    parser.add_argument("--no-services", dest="services", action="store_false", default=None,
+                        help="skip camera, inspection, telemetry, metrics and checkpoints")
+    parser.add_argument("--no-watchdog", dest="watchdog", action="store_false", default=None,
+                        help="do not stop the motors when the loop stops heartbeating")
+    parser.add_argument("--no-scheduler", dest="scheduler", action="store_false", default=None,
+                        help="time turns with a plain sleep and a fixed delay per tick")
+    parser.add_argument("--viewer", action="store_true",
+                        help="draw in a separate viewer process fed by shared memory")
+    parser.add_argument("--telemetry-host", default=TELEMETRY_HOST,
+                        help="interface for telemetry and remote drive (0.0.0.0 accepts any client; "
+                             "drive commands are not authenticated)")
+    parser.add_argument("--max-ticks", type=int, default=None)
+    return parser.parse_args(argv)
+
+def cli(argv=None):
+    engine = main(**vars(parse_args(argv)))
+    print(f"{engine.mode}: {'completed' if engine.done else 'stopped'} after {engine.tick} ticks, "
+          f"{len(engine.plants)}/{engine.plants.size} plants checked, "
+          f"{engine.sim_time:.1f} s simulated")
@@ -0,0 +1,553 @@
+"""
+Navigation strategies (modes) for NavEngine.
+
+Each strategy is the state machine of one of the original scripts,
+generalised from two row groups to any number:
+
+* ``align``      NavSystem11 (also NavSystem6, Nav10, Motor_Nav, MotorNav1):
+                 scan the first lane left to right, then for every later
+                 lane drop down, re-align left, run to the right end and
+                 scan back right to left.
+* ``point_turn`` NavSystem13 (and NavSystem12): point turn down to the next
+                 lane, drive to its start tag, spin 180 degrees and scan
+                 left to right.
+* ``two_sided``  FinalNav: serpentine over the lanes with point turns at the
+                 lane ends, checking each plant by spinning to face the left
+                 and then the right side.
+* ``optimized``  the lane order and scan directions planned by route.py.
+* ``dual_sided`` the optimized route, stopping once per pair of plants at
+                 the same x and inspecting both rows together.
+
+State names are kept from the original scripts, so logs, telemetry and
+metrics read the same as before.
+
+Tag reads reach a strategy as actions (``on_tag``, see tags.py): the lane
+ends, early lane ends and group switches are transitions of its state
+machine, and an action a state cannot carry out is rejected with a
+``tag_action_rejected`` warning instead of moving the motors behind its back.
+"""
+from logging import DEBUG, INFO, WARNING
+
+from farmbot_nav.planner import HeadlandPlanner
+from farmbot_nav.route import EAST, HEADINGS, HEADING_NAMES, TurnModel, plan_route
+
+# Motor levels for pins (7, 11, 13, 15). The scripts were written against
+# two different wirings; each strategy keeps the one it was tuned on.
+NAV13_MOTORS = {
+    "forward": (False, True, True, False),
+    "backward": (True, False, False, True),
+    "spin_left": (True, False, True, False),
+    "spin_right": (False, True, False, True),
+}
+NAV11_MOTORS = {
+    "forward": (True, False, True, False),
+    "backward": (False, True, False, True),
+    "down": (False, True, True, False),
+}
+
+class Strategy:
+    """Base class: ``handlers`` maps each state name to a method."""
+    initial_state = None
+    check_state = "CHECK_PLANT"
+    motor_map = NAV13_MOTORS
+    paired_checks = False
+    scan_states = ()  # States that drive along a lane (where a turn tag can end it)
+    exit_state = None  # State that turns out of a lane
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.handlers = {}
+
+    @property
+    def last_group(self):
+        return self.engine.field.groups - 1
+
+    # --------------------------
+    # Tag Actions
+    # --------------------------
+    def on_tag(self, tag, name, arg):
+        """Carry out action ``name`` of a tag read (handler ``tag_<name>``; False rejects it)."""
+        handler = getattr(self, "tag_" + name, None)
+        if handler is None or handler(tag, arg) is False:
+            e = self.engine
+            e.emit(WARNING, "tag_action_rejected", tag_id=tag.tag_id, action=name, arg=arg, state=e.direction)
+
+    def tag_lane_end(self, tag, arg):
+        """A lane-end tag; the strategy acts on the one its current state drives toward."""
+        next_state = self.lane_end_state(tag)
+        if next_state is not None:
+            self._end_of_lane(tag, next_state)
+
+    def lane_end_state(self, tag):
+        """State to enter when ``tag`` ends the current lane, or None if it does not."""
+        return None
+
+    def tag_localize(self, tag, arg):
+        self.engine.localize(tag)
+
+    def tag_stop(self, tag, arg):
+        self.engine.complete(tag=tag.tag_id)
+
+    def tag_switch_group(self, tag, arg):
+        """Make ``arg`` (default: the tag's group) the next lane, skipping those between."""
+        e = self.engine
+        group = tag.group if arg is None else int(arg) if arg.isdigit() else None
+        if group is None or not self.can_switch_to(group):
+            return False
+        e.flags["next_group"] = group
+
+    def can_switch_to(self, group):
+        # Lanes lie top to bottom; one the bot has already moved down past is out of reach
+        e = self.engine
+        return e.group < group <= self.last_group and e.pos[1] <= e.field.lanes[group]
+
+    def next_group(self):
+        e = self.engine
+        return e.flags.get("next_group", e.group + 1)
+
+    def advance_group(self):
+        e = self.engine
+        e.group = self.next_group()
+        e.flags.pop("next_group", None)
+
+    def tag_turn(self, tag, arg):
+        """End the lane early at this tag, if the strategy's lane-end turn here is ``arg``."""
+        if self.exit_turn() != arg or self.engine.direction not in self.scan_states:
+            return False
+        self._end_of_lane(tag, self.exit_state)
+
+    def exit_turn(self):
+        """Direction ("left"/"right") of the turn out of the current lane, or None."""
+        return None
+
+    def check_plant(self):
+        """Single-sided check: stop and dwell ``check_duration`` ticks."""
+        e = self.engine
+        e.stop()
+        e.check_timer += 1
+        if e.check_timer >= e.check_ticks:
+            e.finish_check()
+
+    def _end_of_lane(self, tag, next_state):
+        """At a lane's end tag: finish the run on the last lane, else move on to ``next_state``."""
+        e = self.engine
+        e.stop()
+        if e.group < self.last_group:
+            e.direction = next_state
+        # Emitted after the state change, so a checkpoint taken here resumes past the tag
+        e.emit(INFO, "rfid_detected", tag=tag.tag_id)
+        if e.group == self.last_group:
+            e.complete(tag=tag.tag_id)
+
+    def hud(self):
+        """Extra status lines for the renderer."""
+        return []
+
+# --------------------------
+# align (NavSystem11)
+# --------------------------
+class AlignStrategy(Strategy):
+    initial_state = "FORWARD"
+    motor_map = NAV11_MOTORS
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.handlers = {
+            "FORWARD": self.forward,
+            "ALIGN_DOWN": self.align_down,
+            "MOVE_TO_RIGHT": self.move_to_right,
+            "BACKWARD": self.backward,
+            "CHECK_PLANT": self.check_plant,
+        }
+
+    def forward(self):
+        e = self.engine
+        # Scan left to right, stopping at each plant to inspect
+        e.scan("forward", e.config.speed, "FORWARD")
+
+    def lane_end_state(self, tag):
+        # The right end of the first lane, then the left end of each later one
+        e = self.engine
+        if tag.group == e.group and (e.direction, tag.side) in (("FORWARD", "right"), ("BACKWARD", "left")):
+            return "ALIGN_DOWN"
+        return None
+
+    def can_switch_to(self, group):
+        # Once the drop to the next lane is done, the bot is on that lane
+        e = self.engine
+        if e.direction == "MOVE_TO_RIGHT" or (
+                e.direction == "ALIGN_DOWN" and e.pos[1] >= e.field.lanes[self.next_group()]):
+            return False
+        return super().can_switch_to(group)
+
+    def align_down(self):
+        e = self.engine
+        # Turn maneuver: first, move down to the next lane
+        if e.pos[1] < e.field.lanes[self.next_group()]:
+            e.drive("down", dy=e.config.speed)
+        # Then, adjust horizontally by moving left (simulate point-turn)
+        elif e.pos[0] > e.field.first_plant_x:
+            e.drive("backward", dx=-e.config.speed)
+        else:
+            e.stop()
+            e.direction = "MOVE_TO_RIGHT"
+            e.emit(INFO, "row_aligned", lane=self.next_group())
+
+    def move_to_right(self):
+        e = self.engine
+        # Move right (no plant checks) to the right end of the next lane
+        if e.pos[0] < e.field.right_x:
+            e.drive("forward", dx=e.config.speed)
+        else:
+            e.stop()
+            self.advance_group()
+            e.direction = "BACKWARD"
+
+    def backward(self):
+        e = self.engine
+        # Check for nearby plants (scanning right-to-left)
+        e.scan("backward", -e.config.speed, "BACKWARD")
+
+# --------------------------
+# point_turn (NavSystem13)
+# --------------------------
+class PointTurnStrategy(Strategy):
+    initial_state = "FORWARD"
+    scan_states = ("FORWARD", "FORWARD_ROWS_3_4")
+    exit_state = "POINT_TURN_1"
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.handlers = {
+            "FORWARD": self.forward,
+            "POINT_TURN_1": self.point_turn_1,
+            "MOVE_DOWN": self.move_down,
+            "POINT_TURN_2": self.point_turn_2,
+            "FORWARD_TO_ROW_3": self.forward_to_start_tag,
+            "TURN_180": self.turn_180,
+            "FORWARD_ROWS_3_4": self.forward_rows,
+            "CHECK_PLANT": self.check_plant,
+        }
+
+    def forward(self):
+        """1. Moving forward in the first row group."""
+        e = self.engine
+        e.scan("forward", e.config.speed, "FORWARD")
+
+    def lane_end_state(self, tag):
+        e = self.engine
+        if e.direction in self.scan_states and tag.group == e.group and tag.side == "right":
+            return "POINT_TURN_1"
+        return None
+
+    def exit_turn(self):
+        return "left"
+
+    def tag_lane_end(self, tag, arg):
+        e = self.engine
+        if e.direction == "FORWARD_TO_ROW_3" and tag.group == e.group and tag.side == "left":
+            self._start_tag(tag)
+        else:
+            super().tag_lane_end(tag, arg)
+
+    def point_turn_1(self):
+        """2. Point turn at the end of the lane."""
+        e = self.engine
+        e.turn("spin_left", e.config.turn_seconds)
+        e.direction = "MOVE_DOWN"
+        e.emit(INFO, "turn_completed", turn="left")
+
+    def move_down(self):
+        """3. Move down to the next lane."""
+        e = self.engine
+        if e.pos[1] < e.field.lanes[self.next_group()]:
+            e.drive("backward", dy=e.config.speed)
+        else:
+            e.stop()
+            e.direction = "POINT_TURN_2"
+            e.emit(INFO, "row_aligned", lane=self.next_group())
+
+    def point_turn_2(self):
+        """4. Second point turn, into the next row group."""
+        e = self.engine
+        e.turn("spin_right", e.config.turn_seconds)
+        self.advance_group()
+        e.flags = {"second_rfid_detected": False, "turning_complete": False}
+        e.direction = "FORWARD_TO_ROW_3"
+        e.emit(INFO, "turn_completed", turn="right", row_group=e.group)
+
+    def forward_to_start_tag(self):
+        """
+        5. Drive to the lane's start tag (no plant checks on this leg).
+        NavSystem12/13 increased x here and drove away from the tag.
+        """
+        e = self.engine
+        e.drive("forward", dx=-e.config.speed)
+
+    def _start_tag(self, tag):
+        e = self.engine
+        e.stop()
+        e.direction = "TURN_180"
+        e.flags["second_rfid_detected"] = True
+        e.emit(INFO, "rfid_detected", tag=tag.tag_id)
+
+    def turn_180(self):
+        """6. Spin 180 degrees at the start tag."""
+        e = self.engine
+        e.emit(DEBUG, "turn_started", turn="180")
+        e.turn("spin_right", e.config.turn_180_seconds)
+        e.direction = "FORWARD_ROWS_3_4"
+        e.flags["turning_complete"] = True
+        e.emit(INFO, "turn_completed", turn="180")
+
+    def forward_rows(self):
+        """7. Scan the lane left to right up to its end tag."""
+        e = self.engine
+        e.scan("forward", e.config.speed, "FORWARD_ROWS_3_4")
+
+    def hud(self):
+        flags = self.engine.flags
+        return [
+            f"Second RFID: {'Detected' if flags.get('second_rfid_detected') else 'Not Detected'}",
+            f"180° Turn: {'Completed' if flags.get('turning_complete') else 'Not Completed'}",
+        ]
+
+# --------------------------
+# two_sided (FinalNav)
+# --------------------------
+class TwoSidedStrategy(Strategy):
+    initial_state = "FORWARD_ROWS_1_2"
+    scan_states = ("FORWARD_ROWS_1_2", "FORWARD_ROWS_3_4")
+    exit_state = "POINT_TURN_LEFT"
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.check_side = None
+        self.handlers = {
+            "FORWARD_ROWS_1_2": self.scan,
+            "FORWARD_ROWS_3_4": self.scan,
+            "POINT_TURN_LEFT": self.first_turn,
+            "MOVE_DOWN_TO_RFID_2": self.move_down,
+            "POINT_TURN_RIGHT_TO_ROWS_3_4": self.second_turn,
+            "CHECK_PLANT": self.check_plant,
+        }
+
+    def _heading(self):
+        # Even lanes are scanned left to right, odd lanes right to left
+        return 1 if self.engine.group % 2 == 0 else -1
+
+    def scan(self):
+        e = self.engine
+        e.scan("forward", self._heading() * e.config.speed, e.direction)
+
+    def lane_end_state(self, tag):
+        e = self.engine
+        side = "right" if self._heading() > 0 else "left"
+        if e.direction in self.scan_states and tag.group == e.group and tag.side == side:
+            return "POINT_TURN_LEFT"
+        return None
+
+    def exit_turn(self):
+        return "left" if self._heading() > 0 else "right"
+
+    def can_switch_to(self, group):
+        # The serpentine reaches the next lane at the end its scan starts from
+        # only when the lane number changes parity
+        return super().can_switch_to(group) and (group - self.engine.group) % 2 == 1
+
+    def _outward_turns(self):
+        # Turning toward the next lane mirrors at the left end of the field
+        return ("spin_left", "spin_right") if self._heading() > 0 else ("spin_right", "spin_left")
+
+    def first_turn(self):
+        e = self.engine
+        e.turn(self._outward_turns()[0], e.config.turn_seconds)
+        e.direction = "MOVE_DOWN_TO_RFID_2"
+
+    def move_down(self):
+        e = self.engine
+        if e.pos[1] < e.field.lanes[self.next_group()]:
+            e.drive("backward", dy=e.config.speed)
+        else:
+            e.stop()
+            e.direction = "POINT_TURN_RIGHT_TO_ROWS_3_4"
+            e.emit(INFO, "row_aligned", lane=self.next_group())
+
+    def second_turn(self):
+        e = self.engine
+        e.turn(self._outward_turns()[1], e.config.turn_seconds)
+        self.advance_group()
+        e.direction = "FORWARD_ROWS_1_2" if self._heading() > 0 else "FORWARD_ROWS_3_4"
+        e.emit(INFO, "turn_completed", row_group=e.group)
+
+    def check_plant(self):
+        """Spin to face the left side, check, spin to face the right side, check, re-center."""
+        e = self.engine
+        e.check_timer += 1
+        turn = e.config.turn_seconds
+        if self.check_side is None:
+            self.check_side = "TURN_LEFT"
+        if self.check_side == "TURN_LEFT":
+            e.turn("spin_left", turn)
+            self.check_side = "CHECK_LEFT"
+        elif self.check_side == "CHECK_LEFT":
+            if e.check_timer >= e.check_ticks:
+                e.check_timer = 0
+                e.turn("spin_right", turn)  # return to center from left side
+                self.check_side = "TURN_RIGHT"
+        elif self.check_side == "TURN_RIGHT":
+            e.turn("spin_right", turn)  # now facing right side from center position
+            self.check_side = "CHECK_RIGHT"
+        elif self.check_side == "CHECK_RIGHT":
+            if e.check_timer >= e.check_ticks:
+                e.turn("spin_left", turn)  # back to the original heading
+                self.check_side = None
+                e.finish_check()
+
+# --------------------------
+# optimized (route.py)
+# --------------------------
+class RouteStrategy(Strategy):
+    """
+    Drives the legs of a RoutePlan: turns, transit moves with no plant checks
+    and lane scans. The current leg and heading (and the legs, once a detour
+    has been added) live in ``engine.flags`` so they are part of checkpoints.
+    Lane-end tags need no action (legs end on them); the lane order is
+    planned up front, so ``switch_group`` and ``turn`` tags are rejected.
+    """
+    tag_switch_group = None
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        headland = None
+        if engine.field_map is not None:
+            headland = HeadlandPlanner(engine.field_map, engine.field, engine.config,
+                                       TurnModel.from_config(engine.config), engine.path_cache)
+        self.plan = plan_route(engine.field, engine.config, headland=headland)
+        self.initial_state = self.plan.legs[0][0].upper()
+        self.handlers = {
+            "TURN": self.turn,
+            "TRANSIT": self.move,
+            "SCAN": self.move,
+            "CHECK_PLANT": self.check_plant,
+        }
+
+    @property
+    def legs(self):
+        return self.engine.flags.get("legs") or self.plan.legs
+
+    def _leg(self):
+        return self.legs[self.engine.flags.get("leg", 0)]
+
+    def _next_leg(self):
+        e = self.engine
+        leg = e.flags.get("leg", 0) + 1
+        e.flags["leg"] = leg
+        if leg == len(self.legs):
+            e.complete(tag=self._tag_here())
+        else:
+            e.direction = self.legs[leg][0].upper()
+
+    def _tag_here(self):
+        # Legs end exactly on the lane-end tags
+        tag = self.engine.tags.at(*self.engine.pos)
+        return tag.tag_id if tag is not None else None
+
+    def turn(self):
+        e = self.engine
+        heading = e.flags.get("heading", EAST)
+        target = self._leg()[1]
+        steps = (target - heading) % 4
+        seconds = e.config.turn_180_seconds if steps == 2 else e.config.turn_seconds
+        e.turn("spin_left" if steps == 3 else "spin_right", seconds)
+        e.flags["heading"] = target
+        e.emit(DEBUG, "turn_completed", heading=HEADING_NAMES[target])
+        self._next_leg()
+
+    def move(self):
+        e = self.engine
+        leg = self._leg()
+        target = leg[1]
+        speed = e.config.speed
+        dx = max(-speed, min(speed, target[0] - e.pos[0]))
+        dy = max(-speed, min(speed, target[1] - e.pos[1]))
+        if leg[0] == "scan":
+            e.group = leg[2]
+            if e.look_first("SCAN"):
+                return
+        if not e.drive("forward", dx=dx, dy=dy):
+            return
+        if leg[0] == "scan":
+            index = e.find_plant()
+            if index >= 0:
+                e.begin_check(index, "SCAN")
+                return
+        if e.pos[0] == target[0] and e.pos[1] == target[1]:
+            e.stop()
+            tag = self._tag_here()
+            self._next_leg()
+            if tag is not None and not e.done:
+                e.emit(INFO, "rfid_detected", tag=tag)
+
+    def reroute(self, reading, guard):
+        """
+        Detour around an obstacle blocking the current leg: side-step, pass it
+        (still scanning on a scan leg), step back and carry on. Returns False
+        if neither side is clear, so the guard keeps waiting.
+        """
+        e = self.engine
+        leg = self._leg()
+        if leg[0] == "turn":
+            return False
+        distance, obstacle = reading
+        clearance = e.config.stop_distance
+        radius = obstacle.radius if obstacle is not None else clearance
+        heading = e.flags.get("heading", EAST)
+        ux, uy = HEADINGS[heading]
+        x, y = e.pos
+        remaining = (leg[1][0] - x) * ux + (leg[1][1] - y) * uy
+        past = min(remaining, distance + 2 * radius + clearance)
+        offset = radius + clearance
+        obstacles = getattr(guard.sensor, "obstacles", None)
+        half_width = getattr(guard.sensor, "half_width", 8)
+
+        def clear(start, end):
+            if obstacles is None:
+                return True
+            length = abs(end[0] - start[0]) + abs(end[1] - start[1])
+            direction = ((end[0] > start[0]) - (end[0] < start[0]), (end[1] > start[1]) - (end[1] < start[1]))
+            return obstacles.first_along(start, direction, length, half_width) is None
+
+        for side in ((heading + 3) % 4, (heading + 1) % 4):
+            sx, sy = HEADINGS[side]
+            a = (x + sx * offset, y + sy * offset)
+            b = (a[0] + ux * past, a[1] + uy * past)
+            c = (x + ux * past, y + uy * past)
+            if clear((x, y), a) and clear(a, b) and clear(b, c):
+                break
+        else:
+            return False
+        detour = [("turn", side), ("transit", a), ("turn", heading), (leg[0], b) + tuple(leg[2:]),
+                  ("turn", (side + 2) % 4), ("transit", c), ("turn", heading)]
+        index = e.flags.get("leg", 0)
+        legs = list(self.legs)
+        legs[index:index] = detour
+        e.flags["legs"] = legs
+        e.direction = "TURN"
+        return True
+
+    def hud(self):
+        return [f"Route: {self.plan.describe()}",
+                f"Leg: {self.engine.flags.get('leg', 0) + 1}/{len(self.legs)}"]
+
+class DualSidedStrategy(RouteStrategy):
+    """The optimized route with one stop per plant pair, both rows inspected at once."""
+    paired_checks = True
+
+STRATEGIES = {
+    "align": AlignStrategy,
+    "point_turn": PointTurnStrategy,
+    "two_sided": TwoSidedStrategy,
+    "optimized": RouteStrategy,
+    "dual_sided": DualSidedStrategy,
+}
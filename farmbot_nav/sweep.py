@@ -0,0 +1,237 @@
+"""
+Parameter sweeps over the headless simulator.
+
+Each point of a sweep is a set of NavConfig values, plus optionally
+``mode`` and NoiseModel values (``seed``, ``detect_sigma``, ...). Points
+are run in a process pool, and each run reports:
+
+* ``seconds``: simulated completion time (``done`` is False if the run
+  did not finish within the tick limit),
+* ``misses``: plants never checked,
+* ``repeats``: plants checked more than once,
+* ``false_stops``: checks made with the bot's simulated true position
+  more than ``check_distance + tolerance`` pixels from the plant (pose
+  drift, see ``odometry_scale`` and ``localize``),
+* ``stops``: inspection stops.
+
+Results are cached under a hash of the point, field and settings, so a
+repeated or extended sweep only runs the new points::
+
+    python -m farmbot_nav.sweep --grid speed=1,2,4 check_distance=10,20,30
+    python -m farmbot_nav.sweep --random 200 speed=1:6 check_duration=10:40 mode=point_turn,optimized
+    python -m farmbot_nav.sweep --grid seed=0,1,2,3 detect_latency=0,3,6 detect_sigma=4
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import multiprocessing
+import random
+import time
+
+from farmbot_nav.checkpoint import atomic_write_json, load_checkpoint
+from farmbot_nav.engine import Field, NavConfig, NavEngine
+from farmbot_nav.noise import NoiseModel
+
+SWEEP_VERSION = 5  # Bump when the simulator changes in a way that invalidates cached results
+NOISE_KEYS = set(NoiseModel().as_dict())
+CONFIG_KEYS = set(NavConfig().as_dict()) | NOISE_KEYS | {"mode"}
+METRICS = ("done", "seconds", "misses", "repeats", "false_stops", "stops")
+
+# --------------------------
+# Search Spaces
+# --------------------------
+def grid_points(space):
+    """Every combination of ``space`` (name -> list of values), in a stable order."""
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+def random_points(space, count, seed=0):
+    """
+    ``count`` random points: a list value is sampled uniformly, a
+    ``(lo, hi)`` tuple uniformly in the range (integers if both ends are).
+    """
+    rng = random.Random(seed)
+    names = sorted(space)
+    points = []
+    for _ in range(count):
+        point = {}
+        for name in names:
+            values = space[name]
+            if isinstance(values, tuple):
+                lo, hi = values
+                both_int = isinstance(lo, int) and isinstance(hi, int)
+                point[name] = rng.randint(lo, hi) if both_int else rng.uniform(lo, hi)
+            else:
+                point[name] = rng.choice(values)
+        points.append(point)
+    return points
+
+# --------------------------
+# Running Points
+# --------------------------
+def run_point(point, field=None, tolerance=5, max_ticks=200000):
+    """Simulate one point; returns its metrics dict."""
+    params = dict(point)
+    mode = params.pop("mode", "point_turn")
+    noise = {name: params.pop(name) for name in list(params) if name in NOISE_KEYS}
+    config = NavConfig(**params)
+    engine = NavEngine(field, mode, config, noise=NoiseModel(**noise) if noise else None)
+    reach = config.check_distance + tolerance
+    checks = {}
+    off_center = 0
+
+    def on_event(engine, level, event, fields):
+        nonlocal off_center
+        if event == "plant_checked":
+            plant = fields["plant"]
+            checks[plant] = checks.get(plant, 0) + 1
+            if abs(engine.true_pos[0] - plant[0]) > reach:
+                off_center += 1
+
+    engine.add_listener(on_event)
+    engine.run(max_ticks)
+    return {
+        "done": engine.done,
+        "seconds": round(engine.sim_time, 3),
+        "misses": engine.plants.size - len(checks),
+        "repeats": sum(1 for count in checks.values() if count > 1),
+        "false_stops": off_center,
+        "stops": engine.plant_stops,
+    }
+
+def point_key(point, field, tolerance, max_ticks):
+    data = [SWEEP_VERSION, point, field.to_dict(), tolerance, max_ticks]
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+def _run_job(args):
+    key, point, field, tolerance, max_ticks = args
+    return key, run_point(point, field, tolerance, max_ticks)
+
+class SweepCache:
+    """Metrics by point hash, optionally kept in a JSON file."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.results = (load_checkpoint(path) or {}) if path else {}
+
+    def save(self):
+        if self.path:
+            atomic_write_json(self.path, self.results)
+
+def sweep(points, field=None, workers=1, cache=None, tolerance=5, max_ticks=200000):
+    """
+    Run ``points`` (skipping cached ones) and return (rows, computed): one
+    row per point, its parameters merged with its metrics.
+    """
+    field = field or Field()
+    cache = cache if cache is not None else SweepCache()
+    keys = [point_key(point, field, tolerance, max_ticks) for point in points]
+    jobs = {}
+    for key, point in zip(keys, points):
+        if key not in cache.results and key not in jobs:
+            jobs[key] = (key, point, field, tolerance, max_ticks)
+    if workers > 1 and len(jobs) > 1:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(_run_job, jobs.values(), chunksize=max(1, len(jobs) // (4 * workers)))
+    else:
+        results = map(_run_job, jobs.values())
+    cache.results.update(results)
+    if jobs:
+        cache.save()
+    rows = [dict(point, **cache.results[key]) for key, point in zip(keys, points)]
+    return rows, len(jobs)
+
+def rank(rows):
+    """Best first: completed runs with no misses or false stops, then by time."""
+    return sorted(rows, key=lambda r: (not r["done"], r["misses"], r["false_stops"],
+                                       r["repeats"], r["seconds"]))
+
+def format_table(rows, limit=None):
+    names = sorted({k for row in rows for k in row} - set(METRICS))
+    columns = names + list(METRICS)
+    shown = rows[:limit] if limit else rows
+    widths = [max(len(c), *(len(_cell(r.get(c))) for r in shown)) if shown else len(c) for c in columns]
+    lines = ["  ".join(c.rjust(w) for c, w in zip(columns, widths))]
+    for row in shown:
+        lines.append("  ".join(_cell(row.get(c)).rjust(w) for c, w in zip(columns, widths)))
+    return "\n".join(lines)
+
+def _cell(value):
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
+
+def write_csv(path, rows):
+    names = sorted({k for row in rows for k in row} - set(METRICS))
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, names + list(METRICS))
+        writer.writeheader()
+        writer.writerows(rows)
+
+# --------------------------
+# Command Line
+# --------------------------
+def _value(text):
+    lowered = text.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+def parse_space(specs, ranges=False):
+    """``name=a,b,c`` -> list of values; with ``ranges``, ``name=lo:hi`` -> (lo, hi)."""
+    space = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in CONFIG_KEYS:
+            raise SystemExit(f"unknown parameter {name!r} (one of {', '.join(sorted(CONFIG_KEYS))})")
+        if ranges and ":" in values:
+            lo, hi = values.split(":")
+            space[name] = (_value(lo), _value(hi))
+        else:
+            space[name] = [_value(v) for v in values.split(",")]
+    return space
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="farmbot_nav.sweep", description=__doc__.split("\n\n")[0])
+    search = parser.add_mutually_exclusive_group(required=True)
+    search.add_argument("--grid", nargs="+", metavar="NAME=V1,V2", help="grid search")
+    search.add_argument("--random", type=int, metavar="N", help="N random points")
+    parser.add_argument("params", nargs="*", metavar="NAME=LO:HI|V1,V2", help="space for --random")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--field", help="field layout JSON (Field.to_dict format)")
+    parser.add_argument("--tolerance", type=float, default=5,
+                        help="pixels beyond check_distance for a false stop")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--cache", default="sweep_cache.json", help="results cache ('' to disable)")
+    parser.add_argument("--csv", help="write every row to this CSV file")
+    parser.add_argument("--top", type=int, default=15, help="rows to print")
+    args = parser.parse_args(argv)
+
+    if args.grid:
+        points = grid_points(parse_space(args.grid))
+    else:
+        points = random_points(parse_space(args.params, ranges=True), args.random, args.seed)
+    field = None
+    if args.field:
+        with open(args.field) as f:
+            field = Field.from_dict(json.load(f))
+
+    began = time.perf_counter()
+    rows, computed = sweep(points, field, args.workers, SweepCache(args.cache or None), args.tolerance)
+    seconds = time.perf_counter() - began
+    rows = rank(rows)
+    print(format_table(rows, args.top))
+    print(f"{len(rows)} points ({computed} simulated, {len(rows) - computed} cached) in {seconds:.2f} s")
+    if args.csv:
+        write_csv(args.csv, rows)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+"""
+RFID tag registry: tags keyed by tag ID, each with the actions a read triggers.
+
+The lane-end tags of a Field get IDs of the form ``lane<group>-<side>``
+(e.g. ``lane0-right``) and the ``lane_end`` action. Any tag may carry more
+actions. Field entries (``Field(tags=...)``) add new tags or attach actions
+to the lane tags::
+
+    {"id": "04A1B2C3", "x": 350, "y": 225, "actions": ["localize", "stop"]}
+    {"id": "lane1-left", "actions": ["switch_group:3"]}
+
+A read (``NavEngine.on_tag_read`` with the ID from the reader) is one dict
+lookup. Each action is handed to the strategy (``Strategy.on_tag``), which
+carries it out as a transition of its state machine or rejects it:
+
+* ``lane_end``      the end of a lane, if it is the tag the current state
+                    is driving toward (turns, the next lane, the last stop),
+* ``localize``      correct the pose from the tag (localization.py),
+* ``stop``          finish the run here,
+* ``switch_group:N`` make group N the next lane instead of the following one,
+* ``turn:left|right`` end the lane here with the strategy's own lane-end turn.
+
+In simulation the reader is emulated with a grid-cell hash: each tag is
+listed in every cell its reading range overlaps, so a read is one cell
+lookup and costs the same with 4 tags or 4000.
+"""
+import collections
+
+Tag = collections.namedtuple("Tag", "tag_id x y group side actions", defaults=(None, None, ()))
+
+def parse_action(text):
+    """'name' or 'name:arg' -> (name, arg or None)."""
+    name, _, arg = text.partition(":")
+    return name, arg or None
+
+TAG_ACTIONS = ("lane_end", "localize", "stop", "switch_group", "turn")
+
+# --------------------------
+# Registry
+# --------------------------
+class TagRegistry:
+    """Tags by ID and by position, plus a cell hash of the reading ranges of the tags that have actions."""
+
+    def __init__(self, read_range=20):
+        self.read_range = read_range
+        self.by_id = {}
+        self.by_pos = {}
+        self._cells = {}
+
+    @classmethod
+    def for_field(cls, field, read_range=20, lane_actions=()):
+        """Lane-end tags (``lane_end`` plus ``lane_actions``) and the field's own tag entries."""
+        registry = cls(read_range)
+        lane_actions = (("lane_end", None),) + tuple(parse_action(a) for a in lane_actions)
+        for group in range(field.groups):
+            for side in ("left", "right"):
+                if group == 0 and side == "left":
+                    continue  # The first lane starts at the start position, untagged
+                x, y = field.rfid_positions[field.tag(group, side)]
+                registry.add(Tag(f"lane{group}-{side}", x, y, group, side, lane_actions))
+        for entry in field.tags:
+            registry.add_entry(entry)
+        return registry
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def get(self, tag_id):
+        return self.by_id.get(tag_id)
+
+    def at(self, x, y):
+        """The tag placed exactly at (x, y), or None."""
+        return self.by_pos.get((x, y))
+
+    def add(self, tag):
+        old = self.by_id.get(tag.tag_id)
+        if old is not None:
+            self._unindex(old)
+        self.by_id[tag.tag_id] = tag
+        self.by_pos[tag.x, tag.y] = tag
+        if tag.actions:
+            for name, _ in tag.actions:
+                if name not in TAG_ACTIONS:
+                    raise ValueError(f"tag {tag.tag_id}: unknown action {name!r}")
+            for cell in self._range_cells(tag):
+                self._cells.setdefault(cell, []).append(tag)
+        return tag
+
+    def add_entry(self, entry):
+        """Add or extend a tag from a Field ``tags`` entry (dict with id, x, y, actions)."""
+        actions = tuple(parse_action(a) for a in entry.get("actions", ()))
+        old = self.by_id.get(entry["id"])
+        if old is not None:
+            return self.add(old._replace(x=entry.get("x", old.x), y=entry.get("y", old.y),
+                                         actions=old.actions + actions))
+        return self.add(Tag(entry["id"], entry["x"], entry["y"], actions=actions))
+
+    def _unindex(self, tag):
+        if self.by_pos.get((tag.x, tag.y)) is tag:
+            del self.by_pos[tag.x, tag.y]
+        for cell in self._range_cells(tag):
+            bucket = self._cells.get(cell)
+            if bucket and tag in bucket:
+                bucket.remove(tag)
+
+    def _cell(self, x, y):
+        size = 2 * self.read_range
+        return (int(x // size), int(y // size))
+
+    def _range_cells(self, tag):
+        """Cells overlapped by the square within ``read_range`` of the tag (at most 2 x 2)."""
+        r = self.read_range
+        x0, y0 = self._cell(tag.x - r, tag.y - r)
+        x1, y1 = self._cell(tag.x + r, tag.y + r)
+        return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+
+    def read(self, x, y):
+        """The tag with actions in reading range of (x, y), or None (simulated reader)."""
+        bucket = self._cells.get(self._cell(x, y))
+        if bucket:
+            r = self.read_range
+            for tag in bucket:
+                if abs(tag.x - x) < r and abs(tag.y - y) < r:
+                    return tag
+        return None
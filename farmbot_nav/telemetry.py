@@ -0,0 +1,338 @@
+"""
+Remote telemetry and teleoperation over UDP.
+
+The control loop calls ``publish()`` once per tick, which only stores a
+reference to the newest state. A server thread sends delta-encoded binary
+packets to subscribed clients at a fixed rate and forwards their drive
+commands to a ManualDriver. A slow or lossy link can only drop packets;
+it never blocks the control loop. Periodic keyframes resynchronise clients
+after lost deltas. A keyframe's bitmap is split over as many datagrams
+as needed to keep each under MAX_DATAGRAM bytes, so any field size syncs.
+
+DRIVE commands are not authenticated: the server binds to localhost
+unless the caller asks for another interface.
+
+Wire format (little-endian). Every datagram starts with
+``HEADER = magic b"FB", version, message type, sequence number``.
+
+Telemetry body: ``tick (u32), flags (u8)`` then, in flag order,
+  POSE     x, y (f32, f32)
+  STATE    state name (u8 length + UTF-8)
+  CHECKED  newly checked plant indices (u32 count + u32 each)
+  BITMAP   one chunk of the checked bitmap (u32 plant count, u32 byte
+           offset, u32 byte count + packed bits)
+
+Client messages: SUBSCRIBE (also a keepalive), UNSUBSCRIBE,
+DRIVE (u8 command index into DRIVE_COMMANDS) and RELEASE.
+"""
+import select
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+MAGIC = b"FB"
+VERSION = 2
+MAX_DATAGRAM = 1200  # Bytes; stays under a typical path MTU, so no IP fragmentation
+BITMAP_CHUNK = 1024  # Packed bitmap bytes (8192 plants) per datagram
+HEADER = struct.Struct("<2sBBI")
+TELEMETRY_HEAD = struct.Struct("<IB")
+POSE = struct.Struct("<ff")
+U8 = struct.Struct("<B")
+U32 = struct.Struct("<I")
+BITMAP_HEAD = struct.Struct("<III")
+
+MSG_TELEMETRY = 1
+MSG_SUBSCRIBE = 2
+MSG_UNSUBSCRIBE = 3
+MSG_DRIVE = 4
+MSG_RELEASE = 5
+
+FLAG_POSE = 1
+FLAG_STATE = 2
+FLAG_CHECKED = 4
+FLAG_BITMAP = 8
+
+DRIVE_COMMANDS = ("right", "left", "up", "down")
+
+# --------------------------
+# Encoding
+# --------------------------
+def encode_telemetry(seq, tick, pose=None, state=None, new_checked=None, bitmap=None):
+    """
+    Pack one telemetry datagram; fields left as None are omitted.
+    ``bitmap`` is a chunk ``(plant count, byte offset, packed bytes)``.
+    """
+    flags = 0
+    parts = []
+    if pose is not None:
+        flags |= FLAG_POSE
+        parts.append(POSE.pack(*pose))
+    if state is not None:
+        flags |= FLAG_STATE
+        name = state.encode("utf-8")[:255]
+        parts.append(U8.pack(len(name)) + name)
+    if new_checked is not None and len(new_checked):
+        flags |= FLAG_CHECKED
+        indices = np.asarray(new_checked, dtype="<u4")
+        parts.append(U32.pack(len(indices)) + indices.tobytes())
+    if bitmap is not None:
+        flags |= FLAG_BITMAP
+        count, offset, packed = bitmap
+        parts.append(BITMAP_HEAD.pack(count, offset, len(packed)) + packed)
+    return (HEADER.pack(MAGIC, VERSION, MSG_TELEMETRY, seq & 0xFFFFFFFF)
+            + TELEMETRY_HEAD.pack(tick & 0xFFFFFFFF, flags) + b"".join(parts))
+
+def encode_keyframe(seq, tick, pose, state, checked, chunk=BITMAP_CHUNK):
+    """Datagrams of one keyframe: pose, state and the bitmap, ``chunk`` packed bytes at a time."""
+    packed = np.packbits(checked).tobytes()
+    datagrams = []
+    for i, offset in enumerate(range(0, max(len(packed), 1), chunk)):
+        first = i == 0
+        datagrams.append(encode_telemetry(seq + i, tick, pose if first else None, state if first else None,
+                                          bitmap=(len(checked), offset, packed[offset:offset + chunk])))
+    return datagrams
+
+def encode_command(msg_type, seq=0, command=None):
+    data = HEADER.pack(MAGIC, VERSION, msg_type, seq & 0xFFFFFFFF)
+    if msg_type == MSG_DRIVE:
+        data += U8.pack(DRIVE_COMMANDS.index(command))
+    return data
+
+def decode_message(data):
+    """Unpack any datagram into a dict; raises ValueError on malformed input."""
+    if len(data) < HEADER.size:
+        raise ValueError("short datagram")
+    magic, version, msg_type, seq = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a farmbot telemetry datagram")
+    msg = {"type": msg_type, "seq": seq}
+    offset = HEADER.size
+    try:
+        if msg_type == MSG_DRIVE:
+            msg["command"] = DRIVE_COMMANDS[U8.unpack_from(data, offset)[0]]
+        elif msg_type == MSG_TELEMETRY:
+            msg["tick"], flags = TELEMETRY_HEAD.unpack_from(data, offset)
+            offset += TELEMETRY_HEAD.size
+            if flags & FLAG_POSE:
+                msg["pose"] = POSE.unpack_from(data, offset)
+                offset += POSE.size
+            if flags & FLAG_STATE:
+                (length,) = U8.unpack_from(data, offset)
+                msg["state"] = data[offset + 1:offset + 1 + length].decode("utf-8")
+                offset += 1 + length
+            if flags & FLAG_CHECKED:
+                (count,) = U32.unpack_from(data, offset)
+                msg["new_checked"] = np.frombuffer(data, "<u4", count, offset + 4).tolist()
+                offset += 4 + 4 * count
+            if flags & FLAG_BITMAP:
+                count, start, nbytes = BITMAP_HEAD.unpack_from(data, offset)
+                bits = np.frombuffer(data, np.uint8, nbytes, offset + BITMAP_HEAD.size)
+                msg["bitmap"] = (count, start * 8, np.unpackbits(bits).astype(bool))
+    except (struct.error, IndexError) as exc:
+        raise ValueError(f"malformed datagram: {exc}") from None
+    return msg
+
+# --------------------------
+# Server
+# --------------------------
+class TelemetryServer:
+    """
+    UDP telemetry/teleop server.
+
+    ``rate`` is telemetry packets per second; a keyframe (pose, state and
+    full bitmap) goes out every ``keyframe_every`` packets and to every new
+    subscriber. Drive commands are passed to ``driver`` only while
+    ``drive_enabled()`` is true. Bind ``host`` beyond 127.0.0.1 only on a
+    trusted network: anyone who can reach the port can drive.
+    """
+
+    def __init__(self, host="127.0.0.1", port=5005, rate=10.0, driver=None,
+                 drive_enabled=None, keyframe_every=20, client_timeout=5.0):
+        self.rate = rate
+        self.driver = driver
+        self.drive_enabled = drive_enabled or (lambda: driver is not None)
+        self.keyframe_every = keyframe_every
+        self.client_timeout = client_timeout
+        self.packets_sent = 0
+        self.packets_dropped = 0
+        self.commands_received = 0
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind((host, port))
+        self._sock.setblocking(False)
+        self.address = self._sock.getsockname()
+        self._clients = {}  # addr -> last time heard
+        self._needs_keyframe = False
+        self._snapshot = None
+        self._sent_pose = None
+        self._sent_state = None
+        self._sent_checked = None
+        self._seq = 0
+        self._deltas = 0  # Updates sent as deltas since the last keyframe
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def publish(self, tick, pos, state, plants):
+        """Hand over the newest state (one tuple store; no I/O or copying)."""
+        self._snapshot = (tick, (float(pos[0]), float(pos[1])), state, plants)
+
+    def _run(self):
+        period = 1.0 / self.rate
+        next_send = time.monotonic()
+        while not self._stop.is_set():
+            timeout = max(0.0, next_send - time.monotonic())
+            readable, _, _ = select.select([self._sock], [], [], timeout)
+            if readable:
+                self._receive()
+            now = time.monotonic()
+            if now >= next_send:
+                self._send()
+                next_send = max(next_send + period, now)
+
+    def _receive(self):
+        while True:
+            try:
+                data, addr = self._sock.recvfrom(2048)
+            except OSError:  # Includes BlockingIOError: nothing left to read
+                return
+            try:
+                msg = decode_message(data)
+            except ValueError:
+                continue
+            self.commands_received += 1
+            msg_type = msg["type"]
+            if msg_type == MSG_SUBSCRIBE:
+                if addr not in self._clients:
+                    self._needs_keyframe = True
+                self._clients[addr] = time.monotonic()
+            elif msg_type == MSG_UNSUBSCRIBE:
+                self._clients.pop(addr, None)
+            elif msg_type in (MSG_DRIVE, MSG_RELEASE):
+                self._clients[addr] = time.monotonic()
+                if self.driver is not None and self.drive_enabled():
+                    if msg_type == MSG_DRIVE:
+                        self.driver.press(msg["command"])
+                    else:
+                        self.driver.release()
+
+    def _send(self):
+        now = time.monotonic()
+        for addr, seen in list(self._clients.items()):
+            if now - seen > self.client_timeout:
+                del self._clients[addr]
+        snapshot = self._snapshot
+        if snapshot is None or not self._clients:
+            return
+        tick, pose, state, plants = snapshot
+        checked = plants.checked
+        keyframe = (self._needs_keyframe or self._sent_checked is None
+                    or self._deltas >= self.keyframe_every - 1
+                    or len(self._sent_checked) != len(checked))
+        datagrams = None
+        if not keyframe:
+            new_checked = np.flatnonzero(checked & ~self._sent_checked)
+            data = encode_telemetry(
+                self._seq, tick,
+                pose if pose != self._sent_pose else None,
+                state if state != self._sent_state else None,
+                new_checked,
+            )
+            if len(data) <= MAX_DATAGRAM:
+                self._sent_checked[new_checked] = True
+                datagrams = [data]
+                self._deltas += 1
+        if datagrams is None:  # Keyframe, or a delta too big for one datagram
+            datagrams = encode_keyframe(self._seq, tick, pose, state, checked)
+            self._sent_checked = checked.copy()
+            self._needs_keyframe = False
+            # Counted in updates, not sequence numbers: a keyframe may take several datagrams
+            self._deltas = 0
+        self._sent_pose, self._sent_state = pose, state
+        self._seq += len(datagrams)
+        for addr in self._clients:
+            for data in datagrams:
+                try:
+                    self._sock.sendto(data, addr)
+                    self.packets_sent += 1
+                except (BlockingIOError, InterruptedError):
+                    self.packets_dropped += 1  # Send buffer full: drop, never wait
+                except OSError:
+                    self.packets_dropped += 1
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._sock.close()
+
+# --------------------------
+# Client
+# --------------------------
+class TelemetryClient:
+    """Minimal client that rebuilds the robot state from telemetry datagrams."""
+
+    def __init__(self, server_address, timeout=1.0):
+        self.server_address = tuple(server_address)
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.settimeout(timeout)
+        self._seq = 0
+        self.tick = None
+        self.pose = None
+        self.state = None
+        self.checked = None
+        self.last_seq = None
+        self.lost = 0
+
+    def _send(self, msg_type, command=None):
+        self._sock.sendto(encode_command(msg_type, self._seq, command), self.server_address)
+        self._seq += 1
+
+    def subscribe(self):
+        """Subscribe, or keep an existing subscription alive."""
+        self._send(MSG_SUBSCRIBE)
+
+    def unsubscribe(self):
+        self._send(MSG_UNSUBSCRIBE)
+
+    def drive(self, command):
+        """Send a drive command; repeat it faster than the robot's deadman."""
+        self._send(MSG_DRIVE, command)
+
+    def release(self):
+        self._send(MSG_RELEASE)
+
+    def poll(self):
+        """Receive and apply one telemetry datagram. Returns the decoded dict or None."""
+        try:
+            data, _ = self._sock.recvfrom(65536)
+        except socket.timeout:
+            return None
+        msg = decode_message(data)
+        if msg["type"] != MSG_TELEMETRY:
+            return msg
+        if self.last_seq is not None and msg["seq"] > self.last_seq + 1:
+            self.lost += msg["seq"] - self.last_seq - 1
+        self.last_seq = msg["seq"]
+        self.tick = msg["tick"]
+        if "pose" in msg:
+            self.pose = msg["pose"]
+        if "state" in msg:
+            self.state = msg["state"]
+        if "bitmap" in msg:
+            count, start, bits = msg["bitmap"]
+            if self.checked is None or len(self.checked) != count:
+                self.checked = np.zeros(count, dtype=bool)
+            end = min(start + len(bits), count)
+            self.checked[start:end] = bits[:end - start]
+        if "new_checked" in msg and self.checked is not None:
+            self.checked[msg["new_checked"]] = True
+        return msg
+
+    def close(self):
+        self._sock.close()
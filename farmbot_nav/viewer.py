@@ -0,0 +1,265 @@
+"""
+Render-only viewer process fed by shared memory.
+
+With ``--viewer`` the control loop does not import pygame at all. Once per
+tick, StatePublisher writes the robot state into a
+``multiprocessing.shared_memory`` block with one ``struct.pack_into``.
+The state covers tick, pose, state name, status lines, the plants being
+checked and a checked bit per plant. A separate process attaches to the
+block and draws it with the usual FieldRenderer. The viewer can be closed
+and reopened at any time without the mission noticing::
+
+    python -m farmbot_nav --mode point_turn --viewer   # starts a viewer
+    python -m farmbot_nav.viewer                       # (re)attach another
+
+Block layout: a prelude (magic, version, layout and state sizes, the
+publisher's PID), the static layout as JSON (field, mode, check state,
+read range, state names), then a sequence number and the state record,
+which holds the state as an index into the names. The sequence number
+works as a seqlock: the writer makes it odd before writing the record and
+even after. A reader copies the record only while the number is even, and
+keeps the copy only if the number is unchanged afterwards. A reader that
+finds it odd for longer than a write takes keeps its last good copy, and
+raises if the publisher has died mid-write.
+
+A second run does not take over a block whose publisher is still alive.
+"""
+import argparse
+import json
+import os
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from farmbot_nav.engine import Field
+from farmbot_nav.plant_set import PlantSet
+from farmbot_nav.tags import TagRegistry
+
+SHM_NAME = "farmbot_nav"
+MAGIC = b"FBNV"
+VERSION = 3
+PRELUDE = struct.Struct("<4sHIIi")  # magic, version, layout bytes, state bytes, publisher PID
+SEQ = struct.Struct("<Q")
+STATUS_BYTES = 192
+MAX_CHECKS = 4
+DONE = 1
+CLOSED = 2  # The publisher has shut down; the state is final
+NO_STATE = 0xFFFF  # State index of a name missing from the layout
+
+def state_struct(plants):
+    """tick, x, y, state index, status, flags, check count, checks, checked bits (after SEQ)."""
+    return struct.Struct(f"<QddH{STATUS_BYTES}sBB{MAX_CHECKS}i{(plants + 7) // 8}s")
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Exists, owned by another user
+    return True
+
+class StatePublisher:
+    """Owns the shared block and writes an engine's state into it."""
+
+    def __init__(self, engine, name=SHM_NAME):
+        self.engine = engine
+        self.name = name
+        states = list(engine.strategy.handlers)
+        self.state_index = {state: i for i, state in enumerate(states)}
+        layout = json.dumps({
+            "field": engine.field.to_dict(),
+            "mode": engine.mode,
+            "check_state": engine.strategy.check_state,
+            "read_range": engine.tags.read_range,
+            "states": states,
+        }).encode()
+        self.state = state_struct(engine.plants.size)
+        self.offset = PRELUDE.size + len(layout)
+        size = self.offset + SEQ.size + self.state.size
+        try:
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            self._remove_stale(name)
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        PRELUDE.pack_into(self.shm.buf, 0, MAGIC, VERSION, len(layout), self.state.size, os.getpid())
+        self.shm.buf[PRELUDE.size:self.offset] = layout
+        self.seq = 0
+        self.publish()
+
+    @staticmethod
+    def _remove_stale(name):
+        """Unlink a block left behind by a run that crashed; refuse if its publisher is alive."""
+        stale = attach(name)
+        try:
+            magic, _, _, _, pid = PRELUDE.unpack_from(stale.buf, 0)
+        except struct.error:
+            magic = pid = None
+        stale.close()
+        if magic == MAGIC and pid != os.getpid() and _alive(pid):
+            raise RuntimeError(f"shared block {name!r} is in use by a running mission (pid {pid})")
+        stale.unlink()
+
+    def publish(self, status=None, flags=0):
+        """Write the current state under the seqlock; ``status`` overrides the "State:" line."""
+        e = self.engine
+        lines = [status or f"State: {e.direction}"] + e.strategy.hud()
+        checks = list(e.check_indices[:MAX_CHECKS]) if e.direction == e.strategy.check_state else []
+        if e.done:
+            flags |= DONE
+        buf = self.shm.buf
+        SEQ.pack_into(buf, self.offset, self.seq + 1)  # Odd: write in progress
+        self.state.pack_into(
+            buf, self.offset + SEQ.size, e.tick, e.pos[0], e.pos[1],
+            self.state_index.get(e.direction, NO_STATE), "\n".join(lines).encode()[:STATUS_BYTES],
+            flags, len(checks), *(checks + [-1] * (MAX_CHECKS - len(checks))),
+            np.packbits(e.plants.checked).tobytes())
+        self.seq += 2
+        SEQ.pack_into(buf, self.offset, self.seq)
+
+    def close(self):
+        self.publish(flags=CLOSED)
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass  # Replaced by a newer run publishing under the same name
+
+# --------------------------
+# Viewer Side
+# --------------------------
+def attach(name=SHM_NAME):
+    """Open an existing block without letting this process's exit unlink it."""
+    try:
+        return shared_memory.SharedMemory(name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name)
+        # Before 3.13 attaching registers the block with the resource tracker,
+        # which would unlink it (under the running mission) when the viewer exits
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+class SharedView:
+    """
+    The parts of a NavEngine that FieldRenderer draws, read from a shared
+    block. Also serves as its own ``strategy`` (``check_state``, ``hud``).
+    """
+
+    def __init__(self, shm):
+        self.shm = shm
+        magic, version, layout_bytes, state_bytes, self.pid = PRELUDE.unpack_from(shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise RuntimeError(f"shared block {shm.name!r} is not a farmbot_nav state block")
+        layout = json.loads(bytes(shm.buf[PRELUDE.size:PRELUDE.size + layout_bytes]))
+        self.field = Field.from_dict(layout["field"])
+        self.mode = layout["mode"]
+        self.check_state = layout["check_state"]
+        self.states = layout["states"]
+        self.plants = PlantSet(self.field.plants)
+        self.tags = TagRegistry.for_field(self.field, layout["read_range"])
+        self.state = state_struct(self.plants.size)
+        if self.state.size != state_bytes:
+            raise RuntimeError("shared block layout does not match its state record")
+        self.offset = PRELUDE.size + layout_bytes
+        self.strategy = self
+        self.seq = None
+        self.tick = 0
+        self.pos = list(self.field.start_pos)
+        self.direction = ""
+        self.lines = []
+        self.flags = 0
+        self.check_indices = []
+
+    def hud(self):
+        return self.lines[1:]
+
+    @property
+    def status(self):
+        return self.lines[0] if self.lines else None
+
+    def read(self, timeout=0.1):
+        """
+        Copy the latest consistent state; returns False if nothing changed, or
+        if no consistent copy could be made within ``timeout`` seconds (the
+        last good state is kept). Raises RuntimeError if the publisher died
+        in the middle of a write.
+        """
+        buf = self.shm.buf
+        start = self.offset + SEQ.size
+        end = start + self.state.size
+        deadline = None
+        while True:
+            (seq,) = SEQ.unpack_from(buf, self.offset)
+            if seq == self.seq:
+                return False
+            if not seq & 1:
+                data = bytes(buf[start:end])
+                if SEQ.unpack_from(buf, self.offset)[0] == seq:
+                    break
+            # Being written; a write takes microseconds, so back off briefly, then give up
+            now = time.monotonic()
+            if deadline is None:
+                deadline = now + timeout
+            elif now >= deadline:
+                if seq & 1 and not _alive(self.pid):
+                    raise RuntimeError(f"publisher stalled: pid {self.pid} exited in the middle of a write")
+                return False
+            time.sleep(0.0005)
+        self.seq = seq
+        (self.tick, x, y, state, status, self.flags, count, *rest) = self.state.unpack(data)
+        self.pos = [x, y]
+        self.direction = self.states[state] if state < len(self.states) else "?"
+        self.lines = status.rstrip(b"\0").decode(errors="ignore").split("\n")
+        self.check_indices = rest[:count]
+        bits = np.frombuffer(rest[MAX_CHECKS], dtype=np.uint8)
+        self.plants.checked[:] = np.unpackbits(bits, count=self.plants.size).astype(bool)
+        return True
+
+def run_viewer(name=SHM_NAME, fps=30, wait=True):
+    """Draw the shared state until the window is closed."""
+    from farmbot_nav.display import Display
+    from farmbot_nav.render import FieldRenderer
+    shm = None
+    while shm is None:
+        try:
+            shm = attach(name)
+        except FileNotFoundError:
+            if not wait:
+                raise
+            print(f"waiting for a run to publish {name!r}...")
+            time.sleep(1.0)
+    view = SharedView(shm)
+    display = Display(800, 400, f"Farmbot Viewer ({view.mode})")
+    renderer = FieldRenderer(display, view)
+    pygame = display.pygame
+    try:
+        while True:
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                break
+            try:
+                changed = view.read()
+            except RuntimeError as exc:
+                print(exc)
+                break
+            if changed:
+                ended = view.flags & CLOSED and not view.flags & DONE
+                renderer.draw("Run stopped" if ended else view.status)
+            display.clock.tick(fps)
+    finally:
+        display.close()
+        shm.close()
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="farmbot_nav.viewer", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--name", default=SHM_NAME, help="shared memory block to attach to")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--no-wait", dest="wait", action="store_false",
+                        help="exit if no run is publishing yet")
+    args = parser.parse_args(argv)
+    return run_viewer(args.name, args.fps, args.wait)
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+"""
+Control-loop watchdog.
+
+The control loop calls ``heartbeat()`` every tick. A separate thread checks
+that the heartbeats keep coming. If the loop hangs (a stuck draw call, a
+turn sleeping far longer than it should), the last GPIO command would stay
+latched and the motors keep running; instead the watchdog stops all motor
+pins through the backend and latches the stop, so a command the hung loop
+sends late cannot restart them. The next heartbeat releases the latch and
+calls ``on_recover`` so the loop re-sends its motor command.
+
+Known blocking waits are announced with ``expect(seconds)`` (or done with
+``sleep``), which extends the deadline by that much once.
+
+The thread only needs the GIL for a moment, so it also fires while the
+loop sleeps, blocks in C, or spins in Python code. For tests,
+``check(now)`` runs one watchdog pass synchronously with any clock.
+"""
+import threading
+import time
+
+class Watchdog:
+    """
+    Stops ``backend`` (hardware.MotorBackend) when no heartbeat arrives for
+    ``timeout`` seconds. ``on_trip(gap)`` and ``on_recover(gap)`` run on the
+    watchdog thread and the loop thread respectively.
+    """
+
+    def __init__(self, backend, timeout=0.25, poll=None, on_trip=None, on_recover=None,
+                 clock=time.monotonic):
+        self.backend = backend
+        self.timeout = timeout
+        self.poll = poll if poll is not None else timeout / 4
+        self.on_trip = on_trip
+        self.on_recover = on_recover
+        self.clock = clock
+        self.tripped = False
+        self.trips = 0
+        self.heartbeats = 0
+        self.late = 0  # Heartbeat gaps longer than half the timeout (beyond expected waits)
+        self.max_gap = 0.0
+        self._allowance = 0.0
+        self._last = None
+        self._deadline = None
+        self._tripped_at = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="watchdog", daemon=True)
+
+    def start(self):
+        self._last = self.clock()
+        self._deadline = self._last + self.timeout
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+
+    # --------------------------
+    # Loop side
+    # --------------------------
+    def heartbeat(self):
+        """Called once per tick by the control loop."""
+        now = self.clock()
+        if self._last is not None:
+            gap = now - self._last - self._allowance
+            if gap > self.max_gap:
+                self.max_gap = gap
+            if gap > self.timeout / 2:
+                self.late += 1
+        self._last = now
+        self._deadline = now + self.timeout
+        self._allowance = 0.0
+        self.heartbeats += 1
+        if self.tripped:
+            self.tripped = False
+            self.backend.release()
+            if self.on_recover is not None:
+                self.on_recover(now - self._tripped_at)
+
+    def expect(self, seconds):
+        """Allow one wait of ``seconds`` (e.g. a timed turn) without a heartbeat."""
+        self._allowance += seconds
+        self._deadline = self.clock() + seconds + self.timeout
+
+    def sleep(self, seconds):
+        """time.sleep that the watchdog knows about (pass as NavEngine's ``sleep``)."""
+        self.expect(seconds)
+        time.sleep(seconds)
+
+    # --------------------------
+    # Watchdog side
+    # --------------------------
+    def check(self, now=None):
+        """One watchdog pass; returns True if it tripped now."""
+        now = self.clock() if now is None else now
+        deadline = self._deadline
+        if self.tripped or deadline is None or now <= deadline:
+            return False
+        self.backend.stop(latch=True)
+        self.tripped = True
+        self._tripped_at = now
+        self.trips += 1
+        if self.on_trip is not None:
+            self.on_trip(now - self._last)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.poll):
+            self.check()
+
+    def report(self):
+        return (f"watchdog: {self.heartbeats} heartbeats, {self.trips} trips, "
+                f"{self.late} late (> {self.timeout / 2 * 1000:.0f} ms), "
+                f"max gap {self.max_gap * 1000:.1f} ms")